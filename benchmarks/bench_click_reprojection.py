@@ -0,0 +1,52 @@
+"""
+Times the map-click reprojection done by GeoGloWSDataSource: building a
+pyproj Transformer per click (previous behaviour) against the cached
+registry, and a batch of clicks reprojected in one vectorized call.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_click_reprojection
+"""
+import json
+import timeit
+
+import numpy as np
+from pyproj import Transformer
+
+from visualizations.geo_glo_ws import GeoGloWSDataSource
+from visualizations.utils.projection import WGS84, get_transformer, reproject_points
+
+N_CLICKS = 1000
+CLICK = json.dumps({"geometries": [{"type": "Point", "coordinates": [14691485.0, -1620511.0]}]})
+
+
+def per_click_transformer(x, y):
+    transformer = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
+    return transformer.transform(x, y)
+
+
+def cached_transformer(x, y):
+    lon, lat = get_transformer(dst=WGS84).transform(x, y)
+    return float(lon), float(lat)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(-2e7, 2e7, N_CLICKS)
+    ys = rng.uniform(-8e6, 8e6, N_CLICKS)
+
+    before = min(timeit.repeat(lambda: per_click_transformer(xs[0], ys[0]), number=100, repeat=5)) / 100
+    after = min(timeit.repeat(lambda: cached_transformer(xs[0], ys[0]), number=100, repeat=5)) / 100
+    source = min(timeit.repeat(lambda: GeoGloWSDataSource(map_click_data=CLICK), number=100, repeat=5)) / 100
+    loop = min(timeit.repeat(lambda: [cached_transformer(x, y) for x, y in zip(xs, ys)], number=1, repeat=5))
+    batch = min(timeit.repeat(lambda: reproject_points(xs, ys), number=1, repeat=5))
+
+    print(f"{'Transformer per click':<28}: {before * 1e6:10.1f} us")
+    print(f"{'cached transformer':<28}: {after * 1e6:10.1f} us")
+    print(f"{'GeoGloWSDataSource(click)':<28}: {source * 1e6:10.1f} us")
+    print(f"{f'{N_CLICKS} clicks, one by one':<28}: {loop * 1e3:10.2f} ms")
+    print(f"{f'{N_CLICKS} clicks, vectorized':<28}: {batch * 1e3:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Times parse_dates_for_layer on a synthetic GRACE-like GetCapabilities
+document against the previous dateparser-per-value implementation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parse_dates
+"""
+import timeit
+
+import dateparser
+import pandas as pd
+
+from visualizations.utils.time_dimension import parse_dates_for_layer
+
+N_MONTHS = 260
+REPEAT = 5
+
+
+def build_capabilities(n_months=N_MONTHS):
+    stamps = pd.date_range("2002-04-17", periods=n_months, freq="MS")
+    times = ",".join(ts.strftime("%Y-%m-%dT%H:%M:%S.000Z") for ts in stamps)
+    return (
+        '<WMS_Capabilities xmlns="http://www.opengis.net/wms" version="1.3.0">'
+        "<Capability><Layer><Title>root</Title>"
+        "<Layer><Name>lwe_thickness</Name>"
+        f'<Dimension name="time" units="ISO8601">{times}</Dimension>'
+        "</Layer></Layer></Capability></WMS_Capabilities>"
+    )
+
+
+def legacy_parse(text):
+    out = []
+    for item in (d.strip() for d in text.split(",")):
+        parsed = dateparser.parse(item)
+        if parsed:
+            out.append(parsed.strftime("%Y-%m-%d"))
+    return out
+
+
+def main():
+    xml_text = build_capabilities()
+    time_text = xml_text.split('units="ISO8601">')[1].split("<")[0]
+
+    assert legacy_parse(time_text) == parse_dates_for_layer(xml_text, "lwe_thickness")
+
+    before = min(timeit.repeat(lambda: legacy_parse(time_text), number=1, repeat=REPEAT))
+    after = min(timeit.repeat(lambda: parse_dates_for_layer(xml_text, "lwe_thickness"), number=1, repeat=REPEAT))
+
+    print(f"{N_MONTHS} timestamps per capabilities document")
+    print(f"dateparser per value : {before * 1000:8.2f} ms")
+    print(f"ISO fast path        : {after * 1000:8.2f} ms")
+    print(f"speedup              : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
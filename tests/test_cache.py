@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from visualizations.utils import cache as cache_module
+from visualizations.utils.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def wait_for_refresh(cache, key):
+    future = cache._inflight.get(key)
+    if future is not None:
+        future.exception(timeout=5)
+
+
+class TestTTLCache:
+    def test_entries_expire_after_ttl(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        cache.set("a", 1)
+        clock.now += 9
+        assert cache.get("a") == 1
+        clock.now += 1
+        assert cache.get("a") is None
+        assert "a" not in cache
+
+    def test_least_recently_used_is_evicted(self, clock):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_invalidate_where(self, clock):
+        cache = TTLCache(maxsize=8, ttl=10)
+        for key in [("Nepal", "gw"), ("Nepal", "grace"), ("Peru", "gw")]:
+            cache.set(key, key)
+        cache.invalidate_where(lambda key: key[0] == "Nepal")
+        assert len(cache) == 1
+        assert cache.get(("Peru", "gw")) == ("Peru", "gw")
+
+    def test_get_or_load_caches_and_counts(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+        calls = []
+        loader = lambda: calls.append(1) or len(calls)
+        assert cache.get_or_load("a", loader) == 1
+        assert cache.get_or_load("a", loader) == 1
+        clock.now += 10
+        assert cache.get_or_load("a", loader) == 2
+        assert cache.stats() == {"hits": 1, "misses": 2, "stale_hits": 0, "size": 1, "maxsize": 4}
+
+    def test_failed_load_is_not_cached(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10)
+
+        def failing():
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("a", failing)
+        assert cache.get_or_load("a", lambda: 5) == 5
+
+
+class TestStaleWhileRevalidate:
+    def test_stale_value_is_served_while_refreshing(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10, stale_ttl=100)
+        cache.set("a", "old")
+        clock.now += 20
+
+        release = threading.Event()
+
+        def slow_loader():
+            release.wait(5)
+            return "new"
+
+        assert cache.get_or_load("a", slow_loader) == "old"
+        # The refresh is already in flight, so no second one is started
+        assert cache.get_or_load("a", lambda: pytest.fail("second refresh")) == "old"
+        release.set()
+        wait_for_refresh(cache, "a")
+
+        assert cache.get_or_load("a", lambda: pytest.fail("entry is fresh")) == "new"
+        assert cache.stats()["stale_hits"] == 2
+
+    def test_failed_refresh_keeps_the_stale_value(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10, stale_ttl=100)
+        cache.set("a", "old")
+        clock.now += 20
+
+        def failing():
+            raise RuntimeError("upstream down")
+
+        assert cache.get_or_load("a", failing) == "old"
+        wait_for_refresh(cache, "a")
+        assert cache.get_or_load("a", failing) == "old"
+        wait_for_refresh(cache, "a")
+
+    def test_entries_past_stale_ttl_are_reloaded(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10, stale_ttl=100)
+        cache.set("a", "old")
+        clock.now += 110
+        assert cache.get_or_load("a", lambda: "new") == "new"
+
+    def test_get_does_not_return_stale_values(self, clock):
+        cache = TTLCache(maxsize=4, ttl=10, stale_ttl=100)
+        cache.set("a", "old")
+        clock.now += 20
+        assert cache.get("a") is None
+        # ...but keeps the entry around for get_or_load to serve
+        assert cache.get_or_load("a", lambda: "new") == "old"
+        wait_for_refresh(cache, "a")
+
+
+class TestSingleFlight:
+    def test_threads_share_one_load(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.2)
+            return object()
+
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(cache.get_or_load("a", loader))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_waiters_see_the_loader_error(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        started = threading.Event()
+        calls = []
+
+        def failing():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            raise RuntimeError("upstream down")
+
+        errors = []
+
+        def call():
+            try:
+                cache.get_or_load("a", failing)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        owner = threading.Thread(target=call)
+        owner.start()
+        started.wait(5)
+        waiter = threading.Thread(target=call)
+        waiter.start()
+        owner.join()
+        waiter.join()
+
+        assert len(errors) == 2
+        assert len(calls) == 1
+        assert "a" not in cache._inflight
+
+    def test_coroutines_share_one_load(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        async def main():
+            return await asyncio.gather(*(cache.get_or_load_async("a", loader) for _ in range(10)))
+
+        assert asyncio.run(main()) == ["value"] * 10
+        assert len(calls) == 1
+
+    def test_blocking_loader_runs_in_the_executor(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        loop_threads = []
+
+        def loader():
+            loop_threads.append(threading.current_thread())
+            return "value"
+
+        async def main():
+            return await asyncio.gather(*(cache.get_or_load_async("a", loader) for _ in range(5)))
+
+        assert asyncio.run(main()) == ["value"] * 5
+        assert len(loop_threads) == 1
+        assert loop_threads[0] is not threading.main_thread()
+
+    def test_threads_and_coroutines_share_one_load(self):
+        cache = TTLCache(maxsize=4, ttl=60)
+        calls = []
+        started = threading.Event()
+
+        def loader():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return "value"
+
+        thread_result = []
+        thread = threading.Thread(target=lambda: thread_result.append(cache.get_or_load("a", loader)))
+        thread.start()
+        started.wait(5)
+
+        async def main():
+            return await cache.get_or_load_async("a", loader)
+
+        assert asyncio.run(main()) == "value"
+        thread.join()
+        assert thread_result == ["value"]
+        assert len(calls) == 1
@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from visualizations.utils import disk_cache
+from visualizations.utils.disk_cache import (
+    CACHE_DIR_ENV,
+    DiskCache,
+    get_disk_cache,
+    shared_get_or_load,
+    shared_invalidate,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(str(tmp_path / "cache.sqlite3"))
+
+
+@pytest.fixture
+def shared_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    monkeypatch.setattr(disk_cache, "_DISK_CACHE", None)
+    return get_disk_cache()
+
+
+def _load_in_process(path, log_path, results):
+    def loader():
+        with open(log_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.3)
+        return {"pid": os.getpid()}
+
+    results.put(DiskCache(path).get_or_load("key", loader, ttl=60))
+
+
+class TestDiskCache:
+    def test_round_trip(self, cache):
+        cache.set("a", {"min": -1.5, "dates": ["2002-04-16"]}, ttl=60)
+        assert cache.get("a") == {"min": -1.5, "dates": ["2002-04-16"]}
+
+    def test_expired_entries_are_ignored(self, cache):
+        cache.set("a", 1, ttl=-1)
+        assert cache.get("a") is None
+
+    def test_invalidate_prefix_escapes_like_wildcards(self, cache):
+        cache.set("a_b1", 1, ttl=60)
+        cache.set("axb2", 2, ttl=60)
+        cache.invalidate_prefix("a_b")
+        assert cache.get("a_b1") is None
+        assert cache.get("axb2") == 2
+
+    def test_none_results_are_not_stored(self, cache):
+        assert cache.get_or_load("a", lambda: None, ttl=60) is None
+        assert cache.get_or_load("a", lambda: 3, ttl=60) == 3
+
+    def test_lease_is_released_when_the_loader_fails(self, cache):
+        def failing():
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("a", failing, ttl=60)
+
+        started = time.monotonic()
+        assert cache.get_or_load("a", lambda: 1, ttl=60) == 1
+        assert time.monotonic() - started < 1
+
+    def test_expired_lease_is_taken_over(self, cache):
+        conn = cache._connection()
+        conn.execute("INSERT INTO leases (key, until) VALUES (?, ?)", ("a", time.time() - 1))
+        assert cache.get_or_load("a", lambda: 1, ttl=60) == 1
+
+    def test_processes_share_one_load(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        log_path = tmp_path / "loads.log"
+        DiskCache(path)
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = [
+            context.Process(target=_load_in_process, args=(path, str(log_path), results)) for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        values = [results.get(timeout=30) for _ in processes]
+        for process in processes:
+            process.join(timeout=30)
+
+        assert len(log_path.read_text().split()) == 1
+        assert all(value == values[0] for value in values)
+
+
+class TestSharedHelpers:
+    def test_disabled_without_cache_dir(self, monkeypatch):
+        monkeypatch.delenv(CACHE_DIR_ENV, raising=False)
+        monkeypatch.setattr(disk_cache, "_DISK_CACHE", None)
+        calls = []
+        loader = lambda: calls.append(1) or "value"
+
+        assert get_disk_cache() is None
+        assert shared_get_or_load("ns", ["a"], loader, ttl=60) == "value"
+        assert shared_get_or_load("ns", ["a"], loader, ttl=60) == "value"
+        assert len(calls) == 2
+
+    def test_shared_get_or_load(self, shared_cache):
+        calls = []
+        loader = lambda: calls.append(1) or {"min": 1.0}
+
+        assert shared_get_or_load("fetch_range", ["Nepal", "gw"], loader, ttl=60) == {"min": 1.0}
+        assert shared_get_or_load("fetch_range", ["Nepal", "gw"], loader, ttl=60) == {"min": 1.0}
+        assert len(calls) == 1
+
+    def test_shared_invalidate_matches_key_prefixes(self, shared_cache):
+        for region, storage in [("Nepal", "gw"), ("Nepal", "grace"), ("Nepali", "gw")]:
+            shared_get_or_load("fetch_range", [region, storage], lambda: region, ttl=60)
+
+        shared_invalidate("fetch_range", ["Nepal"])
+
+        reloaded = shared_get_or_load("fetch_range", ["Nepal", "gw"], lambda: "reloaded", ttl=60)
+        kept = shared_get_or_load("fetch_range", ["Nepali", "gw"], lambda: "reloaded", ttl=60)
+        assert reloaded == "reloaded"
+        assert kept == "Nepali"
@@ -0,0 +1,97 @@
+import asyncio
+
+import numpy as np
+import pytest
+import requests
+
+from visualizations.utils import fetchrange, local_dataset
+from visualizations.utils.fetchrange import fetch_layer_range, fetch_layer_range_async
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.delenv("GGST_CACHE_DIR", raising=False)
+    monkeypatch.delenv(local_dataset.DATA_DIR_ENV, raising=False)
+    fetchrange._RANGE_CACHE.clear()
+    local_dataset._LOCAL_CACHE.clear()
+    yield
+    fetchrange._RANGE_CACHE.clear()
+    local_dataset._LOCAL_CACHE.clear()
+
+
+@pytest.fixture
+def layer_details(monkeypatch):
+    calls = []
+
+    def fetch(url, layer_name="lwe_thickness"):
+        calls.append(url)
+        return {"scaleRange": [-50, 50], "palettes": ["default"]}
+
+    async def fetch_async(url, layer_name="lwe_thickness"):
+        return fetch(url, layer_name)
+
+    monkeypatch.setattr(fetchrange, "fetch_layer_details", fetch)
+    monkeypatch.setattr(fetchrange, "fetch_layer_details_async", fetch_async)
+    return calls
+
+
+def serve_range(monkeypatch, response):
+    async def async_get(url, **kwargs):
+        return response
+
+    monkeypatch.setattr(fetchrange, "http_get", lambda url, **kwargs: response)
+    monkeypatch.setattr(fetchrange, "async_http_get", async_get)
+
+
+class TestFetchLayerRange:
+    def test_ggst_api_range_is_preferred(self, monkeypatch, layer_details):
+        serve_range(monkeypatch, FakeResponse(200, {"min": "-12.5", "max": 8}))
+
+        assert fetch_layer_range("Nepal", "gw") == {"min": -12.5, "max": 8.0}
+        assert asyncio.run(fetch_layer_range_async("Nepal", "gw")) == {"min": -12.5, "max": 8.0}
+        assert layer_details == []
+
+    @pytest.mark.parametrize("response", [FakeResponse(500), FakeResponse(200, {"min": None, "max": None})])
+    def test_scale_range_when_ggst_api_fails(self, monkeypatch, layer_details, response):
+        serve_range(monkeypatch, response)
+
+        assert fetch_layer_range("Nepal", "gw") == {"min": -50.0, "max": 50.0}
+        assert asyncio.run(fetch_layer_range_async("Nepal", "gw")) == {"min": -50.0, "max": 50.0}
+
+    def test_ggst_api_error_without_scale_range(self, monkeypatch):
+        serve_range(monkeypatch, FakeResponse(500))
+        monkeypatch.setattr(fetchrange, "fetch_layer_details", lambda url, layer_name="lwe_thickness": {})
+
+        with pytest.raises(requests.HTTPError):
+            fetch_layer_range("Nepal", "gw")
+
+    def test_local_dataset_skips_the_network(self, monkeypatch, tmp_path, layer_details):
+        xr = pytest.importorskip("xarray")
+        pytest.importorskip("netCDF4")
+        values = np.full((3, 2, 2), np.nan)
+        values[0] = [[1.5, -4.0], [2.0, np.nan]]
+        values[2] = [[7.25, 0.0], [np.nan, -1.0]]
+        (tmp_path / "Nepal").mkdir()
+        xr.Dataset(
+            {"lwe_thickness": (("time", "lat", "lon"), values)},
+            coords={"time": np.array(["2002-04-16", "2002-05-16", "2002-06-16"], dtype="datetime64[ns]")},
+        ).to_netcdf(tmp_path / "Nepal" / "Nepal_gw.nc")
+        monkeypatch.setenv(local_dataset.DATA_DIR_ENV, str(tmp_path))
+        serve_range(monkeypatch, None)
+
+        assert fetch_layer_range("Nepal", "gw") == {"min": -4.0, "max": 7.25}
+        assert asyncio.run(fetch_layer_range_async("Nepal", "gw")) == {"min": -4.0, "max": 7.25}
+        assert layer_details == []
@@ -0,0 +1,63 @@
+import pytest
+from pyproj import Transformer
+
+from visualizations.geo_glo_ws import parse_click_points
+from visualizations.utils import point_series
+
+_TO_MAP = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+
+
+@pytest.fixture(autouse=True)
+def default_grid(monkeypatch):
+    monkeypatch.delenv(point_series.GRID_RESOLUTION_ENV, raising=False)
+    monkeypatch.delenv(point_series.GRID_ORIGIN_ENV, raising=False)
+
+
+def map_xy(longitude, latitude):
+    return list(_TO_MAP.transform(longitude, latitude))
+
+
+def clicks(*geometries):
+    return {"geometries": list(geometries)}
+
+
+class TestParseClickPoints:
+    def test_point(self):
+        points = parse_click_points(clicks({"type": "Point", "coordinates": map_xy(85.3, 27.7)}))
+        assert points == [(27.625, 85.375)]
+
+    def test_type_defaults_to_point(self):
+        assert parse_click_points(clicks({"coordinates": map_xy(85.3, 27.7)})) == [(27.625, 85.375)]
+
+    def test_clicks_in_one_cell_are_deduplicated(self):
+        points = parse_click_points(clicks(
+            {"type": "Point", "coordinates": map_xy(85.30, 27.70)},
+            {"type": "MultiPoint", "coordinates": [map_xy(85.26, 27.74), map_xy(-60.1, -3.1)]},
+        ))
+        assert points == [(27.625, 85.375), (-3.125, -60.125)]
+
+    def test_polygon_selects_covered_cells(self):
+        ring = [map_xy(lon, lat) for lon, lat in [(85.0, 27.0), (85.5, 27.0), (85.5, 27.5), (85.0, 27.5), (85.0, 27.0)]]
+        points = parse_click_points(clicks({"type": "Polygon", "coordinates": [ring]}))
+        assert sorted(points) == [(27.125, 85.125), (27.125, 85.375), (27.375, 85.125), (27.375, 85.375)]
+
+    @pytest.mark.parametrize("geometry", [
+        {"type": "LineString", "coordinates": [[0, 0], [1e5, 1e5]]},
+        {"type": "Point", "coordinates": None},
+        {"type": "Point", "coordinates": ["a", "b"]},
+        {"type": "MultiPoint", "coordinates": [[0], "x"]},
+        {"type": "Polygon", "coordinates": [[[0, 0], [1, 1]]]},
+        {"type": "Polygon", "coordinates": []},
+    ])
+    def test_unusable_geometries_are_ignored(self, geometry):
+        assert parse_click_points(clicks(geometry)) == []
+
+    def test_no_geometries(self):
+        assert parse_click_points({}) == []
+        assert parse_click_points({"geometries": None}) == []
+
+    def test_large_selections_are_capped(self):
+        ring = [map_xy(lon, lat) for lon, lat in [(80.0, 20.0), (90.0, 20.0), (90.0, 30.0), (80.0, 30.0)]]
+        points = parse_click_points(clicks({"type": "Polygon", "coordinates": [ring]}))
+        assert len(points) == point_series.MAX_POINTS
+        assert len(set(points)) == point_series.MAX_POINTS
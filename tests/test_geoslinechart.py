@@ -0,0 +1,29 @@
+import pytest
+
+from visualizations import geoslinechart
+from visualizations.geoslinechart import GeoSLineChart
+
+
+@pytest.fixture
+def prefetched(monkeypatch):
+    storages = []
+    monkeypatch.setattr(geoslinechart, "prefetch_region_summaries", storages.append)
+    return storages
+
+
+@pytest.mark.parametrize("prefetch", [True, "true", "True", "1", "yes"])
+def test_prefetch_enabled(prefetched, prefetch):
+    GeoSLineChart("Nepal", "grace,gw", prefetch=prefetch)
+    assert prefetched == ["grace", "gw"]
+
+
+@pytest.mark.parametrize("prefetch", [False, None, "", "false", "False", "0", "no", 0])
+def test_prefetch_disabled(prefetched, prefetch):
+    GeoSLineChart("Nepal", "grace", prefetch=prefetch)
+    assert prefetched == []
+
+
+def test_metadata_stays_third_positional_argument(prefetched):
+    source = GeoSLineChart("Nepal", "grace", {"title": "GGST"})
+    assert source.metadata["title"] == "GGST"
+    assert source.max_points is None
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+
+import pytest
+import requests
+
+from visualizations.fetch_dates import FetchDatesDataSource
+from visualizations.utils import layer_dates
+from visualizations.utils.layer_dates import resolve_layer_dates, resolve_layer_dates_async
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """
+    Records which source answered; each returns the dates set on it, None
+    meaning it has nothing for the dataset.
+    """
+    calls = []
+    answers = {"index": None, "local": None, "thredds": ["2002-04-16"]}
+
+    def source(name):
+        def answer(*args):
+            calls.append((name, threading.current_thread()))
+            value = answers[name]
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return answer
+
+    async def thredds_async(*args):
+        return source("thredds")(*args)
+
+    monkeypatch.setattr(layer_dates, "indexed_dates", source("index"))
+    monkeypatch.setattr(layer_dates, "local_layer_dates", source("local"))
+    monkeypatch.setattr(layer_dates, "local_layer_dates_async", lambda *args: asyncio.to_thread(source("local"), *args))
+    monkeypatch.setattr(layer_dates, "fetch_layer_dates", source("thredds"))
+    monkeypatch.setattr(layer_dates, "fetch_layer_dates_async", thredds_async)
+    return answers, calls
+
+
+def resolve_both(region_name, storage_type):
+    return resolve_layer_dates(region_name, storage_type), asyncio.run(resolve_layer_dates_async(region_name, storage_type))
+
+
+def test_index_answers_first(sources):
+    answers, calls = sources
+    answers["index"] = ["2002-05-16"]
+    assert resolve_both("Nepal", "gw") == (["2002-05-16"], ["2002-05-16"])
+    assert [name for name, _ in calls] == ["index", "index"]
+
+
+def test_local_dataset_before_thredds(sources):
+    answers, calls = sources
+    answers["local"] = ["2002-06-16"]
+    assert resolve_both("Nepal", "gw") == (["2002-06-16"], ["2002-06-16"])
+    assert "thredds" not in [name for name, _ in calls]
+
+
+def test_thredds_last(sources):
+    assert resolve_both("Nepal", "gw") == (["2002-04-16"], ["2002-04-16"])
+
+
+def test_async_index_lookup_runs_off_the_event_loop(sources):
+    answers, calls = sources
+    answers["index"] = ["2002-05-16"]
+    asyncio.run(resolve_layer_dates_async("Nepal", "gw"))
+    assert calls[0][1] is not threading.main_thread()
+
+
+def test_fetch_dates_source_survives_thredds_errors(sources):
+    answers, _ = sources
+    answers["thredds"] = requests.ConnectionError("down")
+    source = FetchDatesDataSource("Nepal", "gw")
+    assert source.read()["variable_options_source"] == []
+    assert asyncio.run(source.read_async())["variable_options_source"] == []
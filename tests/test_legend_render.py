@@ -0,0 +1,106 @@
+import base64
+import struct
+import xml.etree.ElementTree as ET
+import zlib
+
+import numpy as np
+import pytest
+
+from visualizations.get_legend import GetLegendGraphic
+from visualizations.utils.legend_render import (
+    PALETTES,
+    has_palette,
+    legend_png_data_uri,
+    legend_svg_data_uri,
+    palette_stops,
+    render_legend_png,
+    render_legend_svg,
+)
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def read_png(data):
+    """
+    Decodes an unfiltered 8-bit RGB PNG into a (height, width, 3) array,
+    checking the signature and every chunk's CRC.
+    """
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks = []
+    offset = 8
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset:offset + 4])
+        tag = data[offset + 4:offset + 8]
+        body = data[offset + 8:offset + 8 + length]
+        (crc,) = struct.unpack(">I", data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(tag + body) & 0xFFFFFFFF
+        chunks.append((tag, body))
+        offset += 12 + length
+
+    assert [tag for tag, _ in chunks] == [b"IHDR", b"IDAT", b"IEND"]
+    width, height, depth, colour_type, compression, filtering, interlace = struct.unpack(">IIBBBBB", chunks[0][1])
+    assert (depth, colour_type, compression, filtering, interlace) == (8, 2, 0, 0, 0)
+
+    raw = np.frombuffer(zlib.decompress(chunks[1][1]), dtype=np.uint8).reshape(height, 1 + width * 3)
+    assert not raw[:, 0].any()
+    return raw[:, 1:].reshape(height, width, 3)
+
+
+def hex_colour(rgb):
+    return "#{:02x}{:02x}{:02x}".format(*rgb)
+
+
+@pytest.mark.parametrize("palette", sorted(PALETTES))
+def test_png_matches_palette_endpoints(palette):
+    pixels = read_png(render_legend_png(palette, width=7, height=120))
+    stops = palette_stops(palette)
+
+    assert pixels.shape == (120, 7, 3)
+    # High values at the top
+    assert tuple(pixels[0, 0]) == stops[-1]
+    assert tuple(pixels[-1, 0]) == stops[0]
+    assert (pixels == pixels[:, :1]).all()
+
+
+@pytest.mark.parametrize("palette", sorted(PALETTES))
+def test_svg_matches_palette_endpoints(palette):
+    root = ET.fromstring(render_legend_svg(palette, -12.5, 30.0))
+    stops = root.findall(f"{SVG}defs/{SVG}linearGradient/{SVG}stop")
+    labels = [text.text for text in root.findall(f"{SVG}text")]
+
+    assert root.tag == f"{SVG}svg"
+    assert stops[0].get("offset") == "0.00%"
+    assert stops[-1].get("offset") == "100.00%"
+    assert stops[0].get("stop-color") == hex_colour(palette_stops(palette)[-1])
+    assert stops[-1].get("stop-color") == hex_colour(palette_stops(palette)[0])
+    assert labels[0] == "30" and labels[-1] == "-12.5"
+
+
+def test_inverted_palette():
+    assert palette_stops("div-RdBu-inv") == palette_stops("div-RdBu")[::-1]
+    pixels = read_png(render_legend_png("div-RdBu-inv"))
+    assert hex_colour(pixels[0, 0]) == "#67001f"
+    assert hex_colour(pixels[-1, 0]) == "#053061"
+
+
+@pytest.mark.parametrize("palette", ["default", "x-Rainbow", "psu-viridis", "rainbow", "missing-inv", None])
+def test_palettes_without_a_definition(palette):
+    assert not has_palette(palette)
+
+
+def test_data_uris_decode():
+    png = legend_png_data_uri("seq-Blues")
+    svg = legend_svg_data_uri("seq-Blues", "-5", "5")
+
+    assert read_png(base64.b64decode(png.split(",", 1)[1])).shape == (250, 40, 3)
+    assert ET.fromstring(base64.b64decode(svg.split(",", 1)[1])).tag == f"{SVG}svg"
+
+
+class TestGetLegendGraphic:
+    def test_local_mode_renders_known_palettes(self):
+        source = GetLegendGraphic(min=-50, max=50, styles="div-RdBu", region_name="Nepal", storage_type="gw", mode="local")
+        assert source.read().startswith("data:image/svg+xml;base64,")
+
+    def test_other_palettes_use_the_thredds_legend(self):
+        source = GetLegendGraphic(min=-50, max=50, styles="default", region_name="Nepal", storage_type="gw", mode="local")
+        assert "REQUEST=GetLegendGraphic" in source.read()
@@ -0,0 +1,209 @@
+import os
+import time
+import xml.etree.ElementTree as ET
+
+import pytest
+import requests
+
+from visualizations.utils import metadata_index as mi
+from visualizations.utils.metadata_index import MetadataIndex, get_index, indexed_dates, refresh_index
+
+REGIONS = [{"label": "Nepal", "value": "Nepal"}, {"label": "Peru", "value": "Peru"}]
+STORAGE_OPTIONS = [{"label": "GRACE", "value": "grace"}, {"label": "Groundwater", "value": "gw"}]
+
+
+class FakeUpstream:
+    """
+    Stands in for ggst-api and THREDDS; failing maps a region to the error
+    its date requests raise.
+    """
+
+    def __init__(self, monkeypatch):
+        self.failing = {}
+        self.crawled = []
+        monkeypatch.setattr(mi, "fetch_region_options", lambda: REGIONS)
+        monkeypatch.setattr(mi, "fetch_storage_options", lambda: STORAGE_OPTIONS)
+        monkeypatch.setattr(mi, "local_layer_dates", lambda region, storage, layer: None)
+        monkeypatch.setattr(mi, "fetch_layer_dates", self.dates)
+        monkeypatch.setattr(mi, "fetch_layer_details", lambda url, layer: {"palettes": ["default"]})
+        monkeypatch.setattr(mi, "fetch_layer_range", lambda region, storage: {"min": -1.0, "max": 1.0})
+
+    def dates(self, url, layer_name):
+        self.crawled.append(url)
+        for region, error in self.failing.items():
+            if f"/{region}/" in url:
+                raise error
+        return ["2002-04-16", "2002-05-16"]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    return FakeUpstream(monkeypatch)
+
+
+@pytest.fixture
+def index_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "index.jsonl")
+    monkeypatch.setenv(mi.INDEX_FILE_ENV, path)
+    monkeypatch.setattr(mi, "_INDEX", None)
+    monkeypatch.setattr(mi, "_INDEX_STATE", {"path": None, "mtime": None, "checked": 0.0})
+    return path
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = FakeExecutor()
+    monkeypatch.setattr(mi, "_REFRESH_EXECUTOR", executor)
+    monkeypatch.setattr(mi, "_REFRESHING", type(mi._REFRESHING)())
+    return executor
+
+
+def aged_index(age):
+    record = {"type": "dataset", "region": "Nepal", "storage": "gw", "updated": time.time() - age}
+    return MetadataIndex(REGIONS, STORAGE_OPTIONS, {("Nepal", "gw"): record})
+
+
+class TestRefreshIndex:
+    def test_writes_every_dataset(self, upstream, index_path):
+        assert refresh_index(index_path) == 4
+
+        index = MetadataIndex.load(index_path)
+        assert index.regions == REGIONS
+        assert index.storage_options == STORAGE_OPTIONS
+        assert sorted(index.datasets) == [("Nepal", "grace"), ("Nepal", "gw"), ("Peru", "grace"), ("Peru", "gw")]
+        assert index.dataset("Peru", "gw")["range"] == {"min": -1.0, "max": 1.0}
+        assert indexed_dates("Nepal", "gw") == ["2002-04-16", "2002-05-16"]
+
+    def test_young_records_are_kept(self, upstream, index_path):
+        refresh_index(index_path)
+        upstream.crawled.clear()
+
+        assert refresh_index(index_path, max_age=3600) == 0
+        assert upstream.crawled == []
+
+    @pytest.mark.parametrize("error", [requests.ConnectionError("down"), ET.ParseError("html page")])
+    def test_failed_dataset_keeps_its_previous_record(self, upstream, index_path, error):
+        refresh_index(index_path)
+        previous = MetadataIndex.load(index_path).dataset("Peru", "gw")
+        upstream.failing["Peru"] = error
+
+        refresh_index(index_path)
+
+        index = MetadataIndex.load(index_path)
+        assert index.dataset("Peru", "gw") == previous
+        assert index.dataset("Nepal", "gw")["updated"] > previous["updated"]
+
+    def test_failed_dataset_without_a_record_is_left_out(self, upstream, index_path):
+        upstream.failing["Peru"] = requests.ConnectionError("down")
+        refresh_index(index_path)
+        assert sorted(MetadataIndex.load(index_path).datasets) == [("Nepal", "grace"), ("Nepal", "gw")]
+
+    def test_empty_catalog_keeps_the_index(self, upstream, index_path, monkeypatch):
+        refresh_index(index_path)
+        before = open(index_path).read()
+        monkeypatch.setattr(mi, "fetch_region_options", lambda: [])
+
+        with pytest.raises(RuntimeError):
+            refresh_index(index_path)
+        assert open(index_path).read() == before
+
+
+class TestMaybeRefresh:
+    def test_fresh_index_is_not_refreshed(self, index_path, executor):
+        mi._maybe_refresh(index_path, aged_index(10))
+        assert executor.submitted == []
+
+    def test_aged_index_is_refreshed_once(self, index_path, executor):
+        mi._maybe_refresh(index_path, aged_index(mi.DEFAULT_MAX_AGE + 1))
+        mi._maybe_refresh(index_path, aged_index(mi.DEFAULT_MAX_AGE + 1))
+        assert executor.submitted == [(index_path, mi.DEFAULT_MAX_AGE)]
+
+    def test_disabled_by_zero_max_age(self, index_path, executor, monkeypatch):
+        monkeypatch.setenv(mi.INDEX_MAX_AGE_ENV, "0")
+        mi._maybe_refresh(index_path, aged_index(10 ** 9))
+        assert executor.submitted == []
+
+    def test_recent_attempt_backs_off(self, index_path, executor):
+        open(mi._attempt_marker(index_path), "w").close()
+        mi._maybe_refresh(index_path, aged_index(mi.DEFAULT_MAX_AGE + 1))
+        assert executor.submitted == []
+
+    def test_retries_after_the_retry_interval(self, index_path, executor):
+        marker = mi._attempt_marker(index_path)
+        open(marker, "w").close()
+        attempted = time.time() - mi.REFRESH_RETRY_INTERVAL - 1
+        os.utime(marker, (attempted, attempted))
+
+        mi._maybe_refresh(index_path, aged_index(mi.DEFAULT_MAX_AGE + 1))
+        assert len(executor.submitted) == 1
+
+    def test_retry_interval_is_capped_at_max_age(self, index_path, executor, monkeypatch):
+        monkeypatch.setenv(mi.INDEX_MAX_AGE_ENV, "60")
+        marker = mi._attempt_marker(index_path)
+        open(marker, "w").close()
+        attempted = time.time() - 61
+        os.utime(marker, (attempted, attempted))
+
+        mi._maybe_refresh(index_path, aged_index(61))
+        assert len(executor.submitted) == 1
+
+
+class TestBackgroundRefresh:
+    def test_failed_refresh_records_the_attempt(self, upstream, index_path, monkeypatch):
+        monkeypatch.setattr(mi, "fetch_region_options", lambda: [])
+        mi._REFRESHING.set()
+
+        mi._background_refresh(index_path, 0)
+
+        assert os.path.exists(mi._attempt_marker(index_path))
+        assert not os.path.exists(index_path + ".lock")
+        assert not mi._REFRESHING.is_set()
+
+    def test_held_lock_skips_the_refresh(self, upstream, index_path):
+        open(index_path + ".lock", "w").close()
+
+        mi._background_refresh(index_path, 0)
+
+        assert upstream.crawled == []
+        assert os.path.exists(index_path + ".lock")
+
+    def test_stale_lock_is_taken_over(self, upstream, index_path):
+        lock = index_path + ".lock"
+        open(lock, "w").close()
+        held_since = time.time() - mi.REFRESH_LOCK_TIMEOUT - 1
+        os.utime(lock, (held_since, held_since))
+
+        mi._background_refresh(index_path, 0)
+
+        assert len(MetadataIndex.load(index_path).datasets) == 4
+        assert not os.path.exists(lock)
+
+
+class TestGetIndex:
+    def test_unset(self, monkeypatch):
+        monkeypatch.delenv(mi.INDEX_FILE_ENV, raising=False)
+        assert get_index() is None
+
+    def test_missing_file(self, index_path):
+        assert get_index() is None
+
+    def test_reloads_a_rewritten_file(self, upstream, index_path, executor, monkeypatch):
+        refresh_index(index_path)
+        assert indexed_dates("Nepal", "gw") == ["2002-04-16", "2002-05-16"]
+
+        index = MetadataIndex.load(index_path)
+        index.datasets[("Nepal", "gw")]["dates"] = ["2002-04-16"]
+        index.dump(index_path)
+        os.utime(index_path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        monkeypatch.setitem(mi._INDEX_STATE, "checked", 0.0)
+        monkeypatch.setattr(mi, "INDEX_CHECK_INTERVAL", 0)
+
+        assert indexed_dates("Nepal", "gw") == ["2002-04-16"]
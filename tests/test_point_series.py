@@ -0,0 +1,82 @@
+import pytest
+
+from visualizations.utils import point_series
+from visualizations.utils.point_series import cell_center, cells_in_polygon, grid, snap_to_grid
+
+
+@pytest.fixture(autouse=True)
+def default_grid(monkeypatch):
+    monkeypatch.delenv(point_series.GRID_RESOLUTION_ENV, raising=False)
+    monkeypatch.delenv(point_series.GRID_ORIGIN_ENV, raising=False)
+
+
+class TestSnapToGrid:
+    def test_cell_indices(self):
+        assert snap_to_grid(-90, -180) == (0, 0)
+        assert snap_to_grid(27.7, 85.3) == (470, 1061)
+
+    def test_points_in_one_cell_share_it(self):
+        assert snap_to_grid(27.70, 85.30) == snap_to_grid(27.74, 85.26)
+        assert snap_to_grid(27.70, 85.30) != snap_to_grid(27.76, 85.30)
+
+    def test_longitude_wraps(self):
+        assert snap_to_grid(0, 180) == snap_to_grid(0, -180)
+        assert snap_to_grid(0, 359.9) == snap_to_grid(0, -0.1)
+
+    def test_latitude_is_clamped_to_the_poles(self):
+        assert snap_to_grid(90, 0)[0] == 719
+        assert snap_to_grid(-95, 0)[0] == 0
+
+    def test_custom_resolution_and_origin(self):
+        assert snap_to_grid(0.3, 0.3, resolution=0.5, origin=(-90.25, -180.25)) == (181, 361)
+        assert snap_to_grid(90, 0, resolution=0.5, origin=(-90.25, -180.25))[0] == 360
+
+
+class TestCellCenter:
+    def test_round_trip(self):
+        latitude, longitude = cell_center(snap_to_grid(27.7, 85.3))
+        assert (latitude, longitude) == (27.625, 85.375)
+        assert snap_to_grid(latitude, longitude) == snap_to_grid(27.7, 85.3)
+
+    def test_centres_stay_within_range(self):
+        assert cell_center(snap_to_grid(90, 179.99)) == (89.875, 179.875)
+        assert cell_center((360, 0), resolution=0.5, origin=(-90.25, -180.25)) == (90.0, -180.0)
+
+
+class TestConfiguredGrid:
+    def test_environment(self, monkeypatch):
+        monkeypatch.setenv(point_series.GRID_RESOLUTION_ENV, "0.5")
+        monkeypatch.setenv(point_series.GRID_ORIGIN_ENV, "-90.25, -180.25")
+        assert grid() == (0.5, (-90.25, -180.25))
+        assert cell_center(snap_to_grid(0.3, 0.3)) == (0.5, 0.5)
+
+    @pytest.mark.parametrize("resolution, origin", [("fine", "-90"), ("0", "a,b"), ("-1", ""), ("100", "1,2,3")])
+    def test_invalid_settings_use_the_defaults(self, monkeypatch, resolution, origin):
+        monkeypatch.setenv(point_series.GRID_RESOLUTION_ENV, resolution)
+        monkeypatch.setenv(point_series.GRID_ORIGIN_ENV, origin)
+        assert grid() == (0.25, (-90.0, -180.0))
+
+
+class TestCellsInPolygon:
+    def test_cells_whose_centre_is_inside(self):
+        square = [(85.0, 27.0), (85.5, 27.0), (85.5, 27.5), (85.0, 27.5), (85.0, 27.0)]
+        lons, lats = zip(*square)
+        assert sorted(cells_in_polygon(lons, lats)) == [
+            (27.125, 85.125), (27.125, 85.375), (27.375, 85.125), (27.375, 85.375),
+        ]
+
+    def test_triangle_excludes_outside_centres(self):
+        lons, lats = zip(*[(85.0, 27.0), (86.0, 27.0), (85.0, 28.0)])
+        points = cells_in_polygon(lons, lats)
+        assert len(points) == 6
+        assert all((lon - 85) + (lat - 27) < 1 for lat, lon in points)
+
+    def test_polygon_smaller_than_a_cell(self):
+        lons, lats = zip(*[(85.30, 27.70), (85.31, 27.70), (85.31, 27.71)])
+        assert cells_in_polygon(lons, lats) == [cell_center(snap_to_grid(27.703, 85.307))]
+
+    def test_custom_grid(self):
+        lons, lats = zip(*[(-0.2, -0.2), (0.7, -0.2), (0.7, 0.7), (-0.2, 0.7)])
+        assert sorted(cells_in_polygon(lons, lats, resolution=0.5, origin=(-90.25, -180.25))) == [
+            (0.0, 0.0), (0.0, 0.5), (0.5, 0.0), (0.5, 0.5),
+        ]
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from visualizations.utils.series import (
+    align_series,
+    downsample_args,
+    downsample_series,
+    parse_series,
+    series_to_xy,
+)
+
+
+def make_series(values):
+    values = np.asarray(values, dtype=np.float32)
+    timestamps = np.datetime64("2002-04-16", "s") + np.arange(len(values)) * np.timedelta64(1, "D")
+    return {"timestamp": timestamps, "value": values}
+
+
+def noisy(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.normal(size=n))
+
+
+class TestParseSeries:
+    def test_pairs_become_columns(self):
+        series = parse_series([["2002-04-16T00:00:00Z", "1.5"], ["2002-05-16T00:00:00Z", None]])
+        assert series["timestamp"].dtype == np.dtype("datetime64[s]")
+        assert series["value"].dtype == np.float32
+        assert series_to_xy(series) == (["2002-04-16", "2002-05-16"], [1.5, None])
+
+    def test_empty(self):
+        assert series_to_xy(parse_series([])) == ([], [])
+
+
+class TestLTTB:
+    @pytest.mark.parametrize("max_points", [3, 4, 10, 99])
+    def test_returns_max_points_in_order(self, max_points):
+        series = make_series(noisy(1000))
+        result = downsample_series(series, max_points, "lttb")
+
+        assert len(result["value"]) == max_points
+        assert np.all(np.diff(result["timestamp"].astype(np.int64)) > 0)
+        assert result["timestamp"][0] == series["timestamp"][0]
+        assert result["timestamp"][-1] == series["timestamp"][-1]
+
+    def test_keeps_a_spike(self):
+        values = np.zeros(500)
+        values[250] = 100.0
+        result = downsample_series(make_series(values), 20, "lttb")
+        assert 100.0 in result["value"]
+
+    def test_tolerates_gaps(self):
+        values = noisy(300)
+        values[100:140] = np.nan
+        result = downsample_series(make_series(values), 30, "lttb")
+        assert len(result["value"]) == 30
+
+
+class TestMinMax:
+    @pytest.mark.parametrize("max_points", [3, 4, 5, 10, 11, 50])
+    def test_never_exceeds_max_points(self, max_points):
+        for n in (max_points + 1, 97, 1000):
+            result = downsample_series(make_series(noisy(n)), max_points, "minmax")
+            assert len(result["value"]) <= max_points
+
+    def test_keeps_extremes_and_endpoints(self):
+        values = noisy(1000)
+        series = make_series(values)
+        result = downsample_series(series, 10, "minmax")
+
+        assert result["value"].min() == series["value"].min()
+        assert result["value"].max() == series["value"].max()
+        assert result["timestamp"][0] == series["timestamp"][0]
+        assert result["timestamp"][-1] == series["timestamp"][-1]
+
+    def test_all_nan_bucket(self):
+        values = noisy(100)
+        values[:60] = np.nan
+        result = downsample_series(make_series(values), 6, "minmax")
+        assert len(result["value"]) <= 6
+
+
+class TestDownsampleSeries:
+    @pytest.mark.parametrize("max_points", [None, 0, 2, 100])
+    def test_unchanged(self, max_points):
+        series = make_series(noisy(100))
+        assert downsample_series(series, max_points) is series
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            downsample_series(make_series(noisy(100)), 10, "mean")
+
+
+class TestDownsampleArgs:
+    @pytest.mark.parametrize(
+        "max_points, expected",
+        [(None, None), ("", None), ("500", 500), (250, 250), ("many", None), ([1], None)],
+    )
+    def test_max_points(self, max_points, expected):
+        assert downsample_args(max_points, "lttb") == (expected, "lttb")
+
+    def test_method_defaults_to_lttb(self):
+        assert downsample_args(10, None) == (10, "lttb")
+        assert downsample_args(10, "") == (10, "lttb")
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            downsample_args(10, "mean")
+
+
+class TestAlignSeries:
+    def test_union_of_timestamps(self):
+        first = make_series([1, 2, 3])
+        second = {"timestamp": first["timestamp"][1:] + np.timedelta64(1, "D"), "value": np.float32([20, 30])}
+
+        aligned = align_series([first, second])
+
+        assert aligned[0]["timestamp"] is aligned[1]["timestamp"]
+        assert len(aligned[0]["timestamp"]) == 4
+        np.testing.assert_array_equal(aligned[0]["value"], [1, 2, 3, np.nan])
+        np.testing.assert_array_equal(aligned[1]["value"], [np.nan, np.nan, 20, 30])
+
+    def test_empty(self):
+        assert align_series([]) == []
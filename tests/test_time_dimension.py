@@ -0,0 +1,289 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from visualizations.utils import time_dimension as td
+from visualizations.utils.time_dimension import (
+    LayerTimeParser,
+    expand_interval,
+    fetch_layer_dates,
+    format_times,
+    invalidate_layer_dates,
+    parse_dates_for_layer,
+    parse_period,
+)
+
+DATASET_URL = "http://thredds.test/wms/regions/data/Nepal/Nepal_gw.nc"
+
+
+def capabilities(times, layer_name="lwe_thickness"):
+    return (
+        '<WMS_Capabilities xmlns="http://www.opengis.net/wms"><Capability>'
+        "<Layer><Title>root</Title>"
+        f"<Layer><Name>{layer_name}</Name>"
+        f'<Dimension name="time" units="ISO8601">{",".join(times)}</Dimension>'
+        "</Layer></Layer></Capability></WMS_Capabilities>"
+    ).encode()
+
+
+def monthly(count):
+    return [f"{2002 + (3 + i) // 12}-{(3 + i) % 12 + 1:02d}-16T00:00:00.000Z" for i in range(count)]
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class FakeThredds:
+    """
+    Serves one capabilities document with an ETag and honours If-None-Match.
+    """
+
+    def __init__(self, times, delay=0):
+        self.times = times
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, url, **kwargs):
+        headers = kwargs.get("headers") or {}
+        with self._lock:
+            self.requests.append(headers)
+        if self.delay:
+            time.sleep(self.delay)
+        etag = f'"{len(self.times)}"'
+        if headers.get("If-None-Match") == etag:
+            return FakeResponse(304, headers={"ETag": etag})
+        return FakeResponse(200, capabilities(self.times), {"ETag": etag})
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.delenv("GGST_CACHE_DIR", raising=False)
+    td._LAYER_DATES_CACHE.clear()
+    td._DATE_INDEX.clear()
+    yield
+    td._LAYER_DATES_CACHE.clear()
+    td._DATE_INDEX.clear()
+
+
+@pytest.fixture
+def thredds(monkeypatch):
+    server = FakeThredds(monthly(200))
+    monkeypatch.setattr(td, "http_get", server)
+    return server
+
+
+class TestExpandInterval:
+    def test_monthly_period(self):
+        assert expand_interval("2002-01-15T00:00:00Z/2002-04-15T00:00:00Z/P1M") == [
+            "2002-01-15", "2002-02-15", "2002-03-15", "2002-04-15",
+        ]
+
+    def test_sub_daily_period_keeps_time_of_day(self):
+        assert expand_interval("2020-01-01T00:00:00Z/2020-01-01T18:00:00Z/PT6H") == [
+            "2020-01-01T00:00:00", "2020-01-01T06:00:00", "2020-01-01T12:00:00", "2020-01-01T18:00:00",
+        ]
+
+    def test_mixed_calendar_and_fixed_period(self):
+        assert expand_interval("2020-01-01/2020-03-05/P1M1D") == ["2020-01-01", "2020-02-02", "2020-03-03"]
+
+    def test_month_end_is_clipped(self):
+        assert expand_interval("2020-01-31T00:00:00Z/2020-04-30T00:00:00Z/P1M") == [
+            "2020-01-31", "2020-02-29", "2020-03-31", "2020-04-30",
+        ]
+
+    def test_period_defaults_to_one_day(self):
+        assert expand_interval("2020-01-01/2020-01-03") == ["2020-01-01", "2020-01-02", "2020-01-03"]
+
+    def test_compact(self):
+        assert expand_interval("2020-01-01/2020-12-01/P1M", compact=True) == ["2020-01-01/2020-12-01/P1M"]
+
+    def test_fractional_period(self):
+        assert expand_interval("2020-01-01T00:00:00Z/2020-01-01T01:30:00Z/PT0.5H") == [
+            "2020-01-01T00:00:00", "2020-01-01T00:30:00", "2020-01-01T01:00:00", "2020-01-01T01:30:00",
+        ]
+        assert expand_interval("2020-01-01/2020-01-02/P0,5D") == [
+            "2020-01-01T00:00:00", "2020-01-01T12:00:00", "2020-01-02T00:00:00",
+        ]
+
+    @pytest.mark.parametrize("period", ["PXM", "P", "P0D", "PT0.1S", "P0.5M"])
+    def test_unexpandable_period_falls_back_to_compact(self, period):
+        interval = f"2020-01-01/2020-12-01/{period}"
+        assert expand_interval(interval) == [interval]
+
+    def test_capabilities_with_odd_periods(self):
+        document = (
+            '<WMS_Capabilities><Capability><Layer><Name>lwe_thickness</Name>'
+            '<Dimension name="time">2020-01-01T00:00:00Z/2020-01-01T01:00:00Z/PT0.5H,2020-02-01/2020-03-01/PXM</Dimension>'
+            "</Layer></Capability></WMS_Capabilities>"
+        )
+        assert parse_dates_for_layer(document, "lwe_thickness") == [
+            "2020-01-01T00:00:00", "2020-01-01T00:30:00", "2020-01-01T01:00:00", "2020-02-01/2020-03-01/PXM",
+        ]
+
+
+class TestParsePeriod:
+    def test_parts(self):
+        assert parse_period("P1Y2M") == {"years": 1, "months": 2}
+        assert parse_period("pt6h") == {"hours": 6}
+        assert parse_period("PT0.5H") == {"hours": 0.5}
+
+    @pytest.mark.parametrize("period", ["PXM", "P", "P0D", "1M", "P0.5M"])
+    def test_invalid(self, period):
+        with pytest.raises(ValueError):
+            parse_period(period)
+
+
+class TestFormatTimes:
+    def test_iso_values(self):
+        assert format_times(["2020-01-01T00:00:00Z", "2020-02-01T00:00:00.000Z"]) == ["2020-01-01", "2020-02-01"]
+
+    def test_utc_offset_falls_back(self):
+        # NumPy would shift this into the next UTC day
+        assert format_times(["2020-01-15T23:00:00+05:00"]) == ["2020-01-15"]
+
+    def test_free_form_values_use_dateparser(self):
+        assert format_times(["2020-01-01T00:00:00Z", "January 5, 2020"]) == ["2020-01-01", "2020-01-05"]
+
+    def test_empty(self):
+        assert format_times([]) == []
+
+
+class TestLayerTimeParser:
+    def test_byte_chunks(self):
+        times = monthly(24)
+        document = capabilities(times)
+        chunks = [document[i:i + 7] for i in range(0, len(document), 7)]
+        assert parse_dates_for_layer(chunks, "lwe_thickness") == [t[:10] for t in times]
+
+    def test_stops_after_the_layer(self):
+        document = capabilities(monthly(3))
+        consumed = []
+
+        def chunks():
+            for chunk in (document[:-40], document[-40:], b"<not xml"):
+                consumed.append(chunk)
+                yield chunk
+
+        # The trailing garbage would raise a ParseError if it were fed
+        assert len(parse_dates_for_layer(chunks(), "lwe_thickness")) == 3
+        assert len(consumed) < 3
+
+    def test_outermost_matching_layer_wins(self):
+        document = (
+            "<WMS_Capabilities><Capability>"
+            "<Layer><Name>lwe_thickness</Name>"
+            '<Layer><Name>lwe_thickness</Name><Dimension name="time">2001-01-01T00:00:00Z</Dimension></Layer>'
+            '<Dimension name="time">2020-01-01T00:00:00Z</Dimension>'
+            "</Layer></Capability></WMS_Capabilities>"
+        )
+        assert parse_dates_for_layer(document, "lwe_thickness") == ["2020-01-01"]
+
+    def test_extent_fallback(self):
+        document = (
+            "<WMT_MS_Capabilities><Capability><Layer><Name>lwe_thickness</Name>"
+            '<Dimension name="time" units="ISO8601"/>'
+            '<Extent name="time">2020-01-01T00:00:00Z,2020-02-01T00:00:00Z</Extent>'
+            "</Layer></Capability></WMT_MS_Capabilities>"
+        )
+        assert parse_dates_for_layer(document, "lwe_thickness") == ["2020-01-01", "2020-02-01"]
+
+    def test_missing_layer(self):
+        assert parse_dates_for_layer(capabilities(monthly(3)), "other_layer") == []
+
+    def test_feed_reports_completion(self):
+        parser = LayerTimeParser("lwe_thickness")
+        document = capabilities(monthly(2))
+        assert parser.feed(document[:20]) is False
+        assert parser.feed(document[20:]) is True
+        assert parser.dates == ["2002-04-16", "2002-05-16"]
+
+
+class TestFetchLayerDates:
+    def test_memoized(self, thredds):
+        first = fetch_layer_dates(DATASET_URL)
+        assert fetch_layer_dates(DATASET_URL) is first
+        assert len(first) == 200
+        assert len(thredds.requests) == 1
+
+    def test_single_flight(self, thredds):
+        thredds.delay = 0.2
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(fetch_layer_dates(DATASET_URL))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(thredds.requests) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_expired_dates_are_revalidated(self, thredds):
+        first = fetch_layer_dates(DATASET_URL)
+        td._LAYER_DATES_CACHE.clear()
+
+        assert fetch_layer_dates(DATASET_URL) is first
+        assert thredds.requests[1] == {"If-None-Match": '"200"'}
+
+    def test_new_months_only_parse_the_tail(self, thredds, monkeypatch):
+        fetch_layer_dates(DATASET_URL)
+        td._LAYER_DATES_CACHE.clear()
+        thredds.times = monthly(202)
+
+        formatted = []
+        original = td.format_times
+
+        def spy(values):
+            formatted.append(len(values))
+            return original(values)
+
+        monkeypatch.setattr(td, "format_times", spy)
+        dates = fetch_layer_dates(DATASET_URL)
+
+        assert formatted == [2]
+        assert dates == [t[:10] for t in monthly(202)]
+
+    def test_rewritten_history_is_parsed_in_full(self, thredds):
+        fetch_layer_dates(DATASET_URL)
+        td._LAYER_DATES_CACHE.clear()
+        thredds.times = monthly(150)
+
+        assert fetch_layer_dates(DATASET_URL) == [t[:10] for t in monthly(150)]
+
+    def test_invalidate_forces_a_full_reload(self, thredds):
+        fetch_layer_dates(DATASET_URL)
+        invalidate_layer_dates(DATASET_URL)
+        fetch_layer_dates(DATASET_URL)
+
+        assert thredds.requests == [{}, {}]
+
+    def test_http_errors_propagate(self, monkeypatch):
+        monkeypatch.setattr(td, "http_get", lambda url, **kwargs: FakeResponse(500))
+        with pytest.raises(requests.HTTPError):
+            fetch_layer_dates(DATASET_URL)
@@ -1,8 +1,63 @@
 import intake
-import requests
 import json
-from pyproj import Transformer
 import plotly.graph_objects as go
+from .utils.point_series import (
+    MAX_POINTS,
+    cell_center,
+    cells_in_polygon,
+    fetch_point_series_many,
+    fetch_point_series_many_async,
+    snap_to_grid,
+)
+from .utils.projection import reproject_points
+from .utils.series import downsample_args, downsample_series, series_to_xy
+
+
+def _is_position(coords):
+    return (
+        isinstance(coords, (list, tuple))
+        and len(coords) >= 2
+        and all(isinstance(c, (int, float)) for c in coords[:2])
+    )
+
+
+def parse_click_points(json_data):
+    """
+    Returns the centres of the GRACE grid cells selected on the map.
+
+    Point and MultiPoint geometries select the cells under their
+    coordinates; a Polygon selects the cells it covers. Other geometry types
+    are ignored. Map coordinates are EPSG:3857 and are reprojected in one call
+    per geometry. Each cell is returned once, so clicks falling in the same
+    cell do not produce duplicate series.
+    """
+    points = []
+    for geometry in json_data.get("geometries") or []:
+        geom_type = geometry.get("type", "Point")
+        coords = geometry.get("coordinates")
+        if geom_type == "Point":
+            positions = [coords] if _is_position(coords) else []
+        elif geom_type == "MultiPoint":
+            positions = [c for c in coords or [] if _is_position(c)]
+        elif geom_type == "Polygon":
+            ring = [c for c in (coords or [[]])[0] if _is_position(c)]
+            if len(ring) >= 3:
+                lons, lats = reproject_points([c[0] for c in ring], [c[1] for c in ring])
+                points.extend(cells_in_polygon(lons, lats))
+            continue
+        else:
+            continue
+        if positions:
+            lons, lats = reproject_points([c[0] for c in positions], [c[1] for c in positions])
+            points.extend(zip(lats.tolist(), lons.tolist()))
+
+    cells = list(dict.fromkeys(snap_to_grid(lat, lon) for lat, lon in points))
+    if len(cells) > MAX_POINTS:
+        # Keep an evenly spread subset so large selections stay readable
+        step = len(cells) / MAX_POINTS
+        cells = [cells[int(i * step)] for i in range(MAX_POINTS)]
+    return [cell_center(cell) for cell in cells]
+
 
 class GeoGloWSDataSource(intake.source.base.DataSource):
     name = 'geo_glo_ws'
@@ -15,30 +70,38 @@ class GeoGloWSDataSource(intake.source.base.DataSource):
     visualization_group = 'GeoGloWS'
     visualization_args = {
         'map_click_data': {'type': 'string', 'description': 'Data from map click'},
-        'storage_type': {'type': 'string', 'description': 'Storage Type'}
+        'storage_type': {'type': 'string', 'description': 'Storage Type'},
+        'max_points': {
+            'type': 'integer',
+            'description': 'Downsample each series to at most this many points',
+            'required': False,
+        },
+        'downsample_method': {
+            'type': 'string',
+            'description': "'lttb' (default) keeps the series' shape, 'minmax' keeps each bucket's extremes",
+            'required': False,
+        },
     }
     visualization_tags = ['chart', 'plot', 'line', 'geoglows']
     visualization_description = 'Display storage values from GeoGloWS API'
 
-    def __init__(self, metadata=None, map_click_data=None, storage_type=None):
+    def __init__(
+        self, metadata=None, map_click_data=None, storage_type=None, max_points=None, downsample_method='lttb'
+    ):
         super().__init__(metadata=metadata)
         self.map_data = map_click_data
-        if self.map_data:
-            transformer = Transformer.from_crs("EPSG:3857", "EPSG:4326", always_xy=True)
-            json_data = json.loads(self.map_data)
-            map_coords = json_data.get("geometries")[0].get("coordinates")
-            lon, lat = transformer.transform(map_coords[0], map_coords[1])
-            
-            self.latitude = lat
-            self.longitude = lon
+        self.points = parse_click_points(json.loads(self.map_data)) if self.map_data else []
+        self.latitude, self.longitude = self.points[0] if self.points else (None, None)
 
         self.storage_type = storage_type or 'grace'
+        self.max_points, self.downsample_method = downsample_args(max_points, downsample_method)
         self._data = None
 
     def update_coordinates(self, latitude, longitude):
         """Update the coordinates and reset the data"""
         self.latitude = latitude
         self.longitude = longitude
+        self.points = [(latitude, longitude)]
         self._data = None
         return self.read()
 
@@ -56,8 +119,7 @@ class GeoGloWSDataSource(intake.source.base.DataSource):
             self._load_data()
         return self._data
 
-    def read(self):
-        """Read the data and return formatted for plotting"""
+    def _check_args(self):
         # Guard against missing or unresolved args
         if (
             self.latitude is None
@@ -73,28 +135,46 @@ class GeoGloWSDataSource(intake.source.base.DataSource):
             f"storage type: {self.storage_type}"
         )
 
+    def read(self):
+        """Read the data and return formatted for plotting"""
+        self._check_args()
         if self._data is None:
             self._load_data()
+        return self._figure()
+
+    async def read_async(self):
+        """Coroutine version of read()"""
+        self._check_args()
+        if self._data is None:
+            await self._load_data_async()
+        return self._figure()
+
+    def _figure(self):
+        if len(self.points) > 1:
+            names = [f"lat: {lat:.3f}, lon: {lon:.3f}" for lat, lon in self.points]
+            title = f"{self.storage_type.upper()} Values for {len(self.points)} locations"
+        else:
+            names = [f"{self.storage_type.upper()} Values"]
+            title = (
+                f"{self.storage_type.upper()} Values for "
+                f"lat: {self.latitude:.4f}, lon: {self.longitude:.4f}"
+            )
+
+        traces = []
+        for name, series in zip(names, self._data):
+            x, y = series_to_xy(downsample_series(series, self.max_points, self.downsample_method))
+            traces.append({"x": x, "y": y, "type": "scatter", "mode": "lines", "name": name})
 
         return {
-            "data": [{
-                "x": self._data['timestamp'],
-                "y": self._data['value'],
-                "type": "scatter",
-                "mode": "lines",
-                "name": f"{self.storage_type.upper()} Values"
-            }],
+            "data": traces,
             "layout": {
-                "title": (
-                    f"{self.storage_type.upper()} Values for "
-                    f"lat: {self.latitude:.4f}, lon: {self.longitude:.4f}"
-                ),
+                "title": title,
                 "xaxis": {"title": "Timestamp", "type": "date"},
                 "yaxis": {"title": f"{self.storage_type.upper()} Value"}
             }
         }
 
-    def _load_data(self):
+    def _points_to_load(self):
         if self.latitude is None or self.longitude is None:
             raise ValueError("Latitude and longitude must be provided")
 
@@ -104,46 +184,13 @@ class GeoGloWSDataSource(intake.source.base.DataSource):
             f"storage type: {self.storage_type}"
         )
 
-        url = (
-            f'http://ggst-api.geoglows.org/api/getPointValues'
-            f'?latitude={self.latitude}'
-            f'&longitude={self.longitude}'
-            f'&storage_type={self.storage_type}'
-        )
+        return self.points or [(self.latitude, self.longitude)]
 
-        try:
-            response = requests.get(url, timeout=30)
-        except requests.RequestException as e:
-            raise Exception(f"GeoGloWS request failed: {e}") from e
-
-        if response.status_code != 200:
-            # Try to extract a user-friendly error message from the JSON response
-            error_message = f"GeoGloWS API error (status {response.status_code})"
-            try:
-                error_data = response.json()
-                if isinstance(error_data, dict):
-                    # Extract common error fields
-                    detail = error_data.get("detail") or error_data.get("error") or error_data.get("message")
-                    if detail:
-                        print(f"GeoGloWS: {detail}")
-                        error_message = "GeoGloWS: Failed to Load the Data"
-            except (ValueError, KeyError):
-                # If JSON parsing fails, use a snippet of the raw text
-                body_snippet = (response.text or "")[:200]
-                if body_snippet:
-                    error_message = f"GeoGloWS API error: {body_snippet}"
-            
-            raise Exception(error_message)
-
-        data = response.json()
-        if "values" not in data:
-            raise Exception(
-                f"GeoGloWS response missing 'values' key. url={url}, keys={list(data.keys())}"
-            )
+    def _load_data(self):
+        self._data = fetch_point_series_many(self._points_to_load(), self.storage_type)
 
-        timestamps = [item[0] for item in data["values"]]
-        values = [item[1] for item in data["values"]]
-        self._data = {"timestamp": timestamps, "value": values}
+    async def _load_data_async(self):
+        self._data = await fetch_point_series_many_async(self._points_to_load(), self.storage_type)
 
 # Register with Intake
 # intake.register_driver(GeoGloWSDataSource.name, GeoGloWSDataSource)
@@ -1,5 +1,14 @@
 import intake
-import requests
+from .utils.region_summary import fetch_region_summaries, fetch_region_summaries_async, prefetch_region_summaries
+from .utils.series import align_series, downsample_args, downsample_series, series_to_xy
+
+
+def _flag(value):
+    # The dashboard may pass booleans as strings; "false" must stay false
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return value is True
+
 
 class GeoSLineChart(intake.source.base.DataSource):
     name = 'geoslinechart'
@@ -18,18 +27,44 @@ class GeoSLineChart(intake.source.base.DataSource):
         },
         'storage_type': {
             'type': 'string',
-            'description': 'Type of storage data to fetch',
+            'description': 'Type of storage data to fetch; a comma-separated list overlays several',
             'default': 'grace',
-        }
+        },
+        'max_points': {
+            'type': 'integer',
+            'description': 'Downsample the series to at most this many points',
+            'required': False,
+        },
+        'downsample_method': {
+            'type': 'string',
+            'description': "'lttb' (default) keeps the series' shape, 'minmax' keeps each bucket's extremes",
+            'required': False,
+        },
+        'prefetch': {
+            'type': 'boolean',
+            'description': 'Warm the summaries of all regions in the background',
+            'required': False,
+        },
     }
     visualization_tags = ['plot', 'geoglows']
     visualization_description = 'GeoGloWS storage values as a Plotly line chart'
 
-    def __init__(self, region='katherine_nt', storage_type='grace', metadata=None):
+    def __init__(
+        self, region='katherine_nt', storage_type='grace', metadata=None, max_points=None,
+        downsample_method='lttb', prefetch=False,
+    ):
         super().__init__(metadata=metadata)
         self.region = region
         self.storage_type = storage_type
+        if isinstance(storage_type, str):
+            self.storage_types = [s.strip() for s in storage_type.split(',') if s.strip()]
+        else:
+            self.storage_types = list(storage_type)
+        self.max_points, self.downsample_method = downsample_args(max_points, downsample_method)
         self._data = None
+        if _flag(prefetch):
+            for storage in self.storage_types:
+                prefetch_region_summaries(storage)
 
     def _get_schema(self):
         return intake.source.base.Schema(datashape=None, dtype=None, shape=None, npartitions=1, extra_metadata={})
@@ -42,35 +77,40 @@ class GeoSLineChart(intake.source.base.DataSource):
     def read(self):
         return self._get_partition(None)
 
+    async def read_async(self):
+        if self._data is None:
+            self._build_figure(await fetch_region_summaries_async(self.region, self.storage_types))
+        return self._data
+
     def _load_data(self):
-        response = requests.post('https://ggst-api.geoglows.org/api/getRegionSummary',
-                                 data={
-                                     'region': self.region,
-                                     'storage_type': self.storage_type,
-                                     },
-                                 headers={
-                                     'accept': 'application/json',
-                                     'Content-Type': 'application/x-www-form-urlencoded',
-                                    },
-                                 )
-        response.raise_for_status()
-        data = response.json()
-        timestamps = [item[0] for item in data['values']]
-        values = [item[1] for item in data['values']]
+        self._build_figure(fetch_region_summaries(self.region, self.storage_types))
+
+    def _build_figure(self, series_list):
+        if len(series_list) > 1:
+            series_list = align_series(series_list)
+
+        traces = []
+        for storage, series in zip(self.storage_types, series_list):
+            timestamps, values = series_to_xy(downsample_series(series, self.max_points, self.downsample_method))
+            trace = {
+                'x': timestamps,
+                'y': values,
+                'mode': 'lines',
+                'type': 'scatter',
+                'name': f'{storage.upper()} Values',
+            }
+            if len(series_list) > 1:
+                # Storage types sampled on different dates leave gaps once aligned
+                trace['connectgaps'] = True
+            traces.append(trace)
+
+        label = ' / '.join(storage.upper() for storage in self.storage_types)
         self._data = {
-            'data': [
-                {
-                    'x': timestamps,
-                    'y': values,
-                    'mode': 'lines',
-                    'type': 'scatter',
-                    'name': f'{self.storage_type.upper()} Values',
-                }
-            ],
+            'data': traces,
             'layout': {
-                'title': f'{self.storage_type.upper()} Values for {self.region.upper()}',
+                'title': f'{label} Values for {self.region.upper()}',
                 'xaxis': {'title': 'Timestamp', 'type': 'date'},
-                'yaxis': {'title': f'{self.storage_type.upper()} Value'},
+                'yaxis': {'title': f'{label} Value' if len(traces) == 1 else 'Storage Value'},
             },
         }
 
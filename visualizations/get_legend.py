@@ -1,5 +1,8 @@
 import intake
-import requests
+from .utils.async_http import HTTP_ERRORS
+from .utils.endpoints import legend_url
+from .utils.legend_cache import legend_data_uri
+from .utils.legend_render import has_palette, legend_png_data_uri, legend_svg_data_uri
 
 class GetLegendGraphic(intake.source.base.DataSource):
     name='get_legend_graphic'
@@ -26,24 +29,48 @@ class GetLegendGraphic(intake.source.base.DataSource):
         'storage_type': {
             'type': 'string', 'description': 'Name of the storage type'
         },
+        'mode': {
+            'type': 'string',
+            'description': (
+                "'url' (default) links THREDDS directly, 'data_uri' serves a locally cached copy, "
+                "'local' (SVG with labels) or 'local_png' render the colour bar without THREDDS"
+            ),
+            'required': False,
+        },
 
     }
     visualization_type = "image"
 
-    def __init__(self, min=None, max=None, styles=None, region_name=None, storage_type=None, metadata=None, **kwargs):
+    def __init__(self, min=None, max=None, styles=None, region_name=None, storage_type=None, mode="url", metadata=None, **kwargs):
         super().__init__(metadata=metadata)
         self.min = min
         self.max = max
         self.styles = styles
         self.region_name = region_name
         self.storage_type = storage_type
+        self.mode = mode
 
     def read(self):
-        if self.region_name != "global":
-            url = f'https://ggst-api.geoglows.org/thredds/wms/regions/data/{self.region_name}/{self.region_name}_{self.storage_type}.nc?SERVICE=WMS&VERSION=1.3.0&REQUEST=GetLegendGraphic&LAYER=lwe_thickness&colorscalerange={self.min},{self.max}&STYLES=raster/{self.styles}&transparent=FALSE&WIDTH=40&HEIGHT=250'
-        else: 
-            url = f'https://ggst-api.geoglows.org/thredds/wms/regions/data/GRC_{self.storage_type}.nc?SERVICE=WMS&VERSION=1.3.0&REQUEST=GetLegendGraphic&LAYER=lwe_thickness&colorscalerange={self.min},{self.max}&STYLES=raster/{self.styles}&transparent=FALSE&WIDTH=40&HEIGHT=250'
-        return url
+        if self.mode in ("local", "local_png") and has_palette(self.styles):
+            try:
+                if self.mode == "local":
+                    return legend_svg_data_uri(self.styles, float(self.min), float(self.max))
+                return legend_png_data_uri(self.styles)
+            except (TypeError, ValueError):
+                # Unresolved min/max; fall back to the THREDDS legend below
+                pass
+
+        url = self._legend_url()
+        if self.mode != "data_uri":
+            return url
+        try:
+            return legend_data_uri(url)
+        except (HTTP_ERRORS + (OSError,)):
+            # Let the browser fetch the legend itself
+            return url
+
+    def _legend_url(self):
+        return legend_url(self.region_name, self.storage_type, self.styles, self.min, self.max)
 
 # http://13.201.155.87:4000/thredds/wms/regions/data/GRC_grace.nc?SERVICE=WMS&VERSION=1.3.0&REQUEST=GetLegendGraphic&LAYER=lwe_thickness&colorscalerange=50,-50&STYLES=raster/default&transparent=FALSE&WIDTH=40&HEIGHT=250
 # https://apps.geoglows.org/thredds/wms/geoglows_data/ggst/GRC_grace.nc?SERVICE=WMS&VERSION=1.3.0&REQUEST=GetLegendGraphic&LAYER=lwe_thickness&colorscalerange=-50,50&STYLES=raster/default&transparent=FALSE&WIDTH=50&HEIGHT=300
\ No newline at end of file
@@ -1,5 +1,9 @@
+import asyncio
 import intake
-import requests
+from .utils.async_http import HTTP_ERRORS
+from .utils.endpoints import dataset_url
+from .utils.metadata_index import indexed_palettes
+from .utils.layer_details import fetch_layer_details, fetch_layer_details_async, layer_palettes
 
 class FetchStyles(intake.source.base.DataSource):
     name = 'fetch_styles'
@@ -33,22 +37,37 @@ class FetchStyles(intake.source.base.DataSource):
         self.data = None
         return self.read()
 
+    def _dataset_url(self):
+        return dataset_url(self.region_name, self.storage_type)
+
+    def _result(self, styles):
+        return {
+            "variable_name": "Styles",
+            "initial_value": styles[0] if styles else None,
+            "variable_options_source": styles
+        }
+
     def read(self):
         """
         Returns configuration for a UI variable input
         """
-        if self.region_name != "global":
-            url = f"http://13.201.155.87:4000/thredds/wms/regions/data/{self.region_name}/{self.region_name}_{self.storage_type}.nc?request=GetMetadata&item=layerDetails&layerName=lwe_thickness"
-        else:
-            url = f"http://13.201.155.87:4000/thredds/wms/regions/data/GRC_{self.storage_type}.nc?request=GetMetadata&item=layerDetails&layerName=lwe_thickness"
+        styles = indexed_palettes(self.region_name, self.storage_type)
+        if styles is not None:
+            return self._result(styles)
 
-        response = requests.get(url)
-        if response.status_code != 200:
+        try:
+            styles = layer_palettes(fetch_layer_details(self._dataset_url(), "lwe_thickness"))
+        except HTTP_ERRORS:
             styles = []
-        else:
-            styles = response.json().get('palettes', [])
-        return {
-            "variable_name": "Styles",
-            "initial_value": styles[0],
-            "variable_options_source": styles
-        }
\ No newline at end of file
+        return self._result(styles)
+
+    async def read_async(self):
+        styles = await asyncio.to_thread(indexed_palettes, self.region_name, self.storage_type)
+        if styles is not None:
+            return self._result(styles)
+
+        try:
+            styles = layer_palettes(await fetch_layer_details_async(self._dataset_url(), "lwe_thickness"))
+        except HTTP_ERRORS:
+            styles = []
+        return self._result(styles)
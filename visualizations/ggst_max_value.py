@@ -1,7 +1,9 @@
+import asyncio
 import intake
 import requests
 from intake.source import base
-from .utils.fetchrange import fetch_range
+from .utils.fetchrange import fetch_layer_range, fetch_layer_range_async
+from .utils.metadata_index import indexed_range
 
 
 class FetchMaxValueDataSource(base.DataSource):
@@ -36,13 +38,30 @@ class FetchMaxValueDataSource(base.DataSource):
         Returns configuration for a UI variable input
         """
         if not self.region_name:
+            return self._result(None)
+
+        value_range = indexed_range(self.region_name, self.storage_type)
+        if value_range is None:
+            value_range = fetch_layer_range(self.region_name, self.storage_type)
+        return self._result(value_range)
+
+    async def read_async(self):
+        if not self.region_name:
+            return self._result(None)
+
+        value_range = await asyncio.to_thread(indexed_range, self.region_name, self.storage_type)
+        if value_range is None:
+            value_range = await fetch_layer_range_async(self.region_name, self.storage_type)
+        return self._result(value_range)
+
+    def _result(self, max_value):
+        if max_value is None:
             return {
                 "variable_name": "Max",
                 "initial_value": None,
                 "variable_options_source": []
             }
 
-        max_value = fetch_range(self.region_name, self.storage_type)
         print(max_value)
         return {
             "variable_name": "Maximum",
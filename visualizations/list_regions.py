@@ -1,6 +1,8 @@
+import asyncio
 import intake
-import requests
 from intake.source import base
+from .utils.catalog import fetch_region_options, fetch_region_options_async
+from .utils.metadata_index import indexed_region_options
 
 # won't work for the global region files need to make it dynamic
 
@@ -27,14 +29,15 @@ class ListRegionsDataSource(base.DataSource):
         if self._cache_initialized and self._cached_data is not None:
             return self._cached_data
             
-        url = 'http://ggst-api.geoglows.org/api/listRegions'
-        response = requests.get(url)
+        return self._result(indexed_region_options() or fetch_region_options())
 
-        if response.status_code != 200:
-            options = []
-        else:
-            options = response.json()
+    async def read_async(self):
+        if self._cache_initialized and self._cached_data is not None:
+            return self._cached_data
+
+        return self._result(await asyncio.to_thread(indexed_region_options) or await fetch_region_options_async())
 
+    def _result(self, options):
         result = {
             "variable_name": "Region", # this is the key that handle the hooks in the javascript
             "initial_value": options[0]["value"] if options else None,
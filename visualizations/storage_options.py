@@ -1,6 +1,8 @@
+import asyncio
 import intake
-import requests
 from intake.source import base
+from .utils.catalog import fetch_storage_options, fetch_storage_options_async
+from .utils.metadata_index import indexed_storage_options
 
 class StorageOptionsDataSource(base.DataSource):
     name = 'storage_options'
@@ -24,14 +26,15 @@ class StorageOptionsDataSource(base.DataSource):
         if self._cache_initialized and self._cached_data is not None:
             return self._cached_data
             
-        url = 'http://ggst-api.geoglows.org/api/getStorageOptions'
-        response = requests.get(url)
+        return self._result(indexed_storage_options() or fetch_storage_options())
 
-        if response.status_code != 200:
-            options = []
-        else:
-            options = response.json().get("storage_options", [])
+    async def read_async(self):
+        if self._cache_initialized and self._cached_data is not None:
+            return self._cached_data
+
+        return self._result(await asyncio.to_thread(indexed_storage_options) or await fetch_storage_options_async())
 
+    def _result(self, options):
         result = {
             "variable_name": "Storage Type",
             "initial_value": options[0]["value"] if options else None,
@@ -0,0 +1,72 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+
+import httpx
+import requests
+
+from .http import DEFAULT_TIMEOUT, POOL_CONNECTIONS, POOL_MAXSIZE, RETRY_BACKOFF, RETRY_STATUSES, RETRY_TOTAL
+
+# Errors raised by either the blocking or the async client
+HTTP_ERRORS = (requests.RequestException, httpx.HTTPError)
+
+# httpx clients are bound to the event loop they were first used on, so one
+# pooled client is kept per running loop.
+_CLIENTS = weakref.WeakKeyDictionary()
+
+
+def _timeout(timeout):
+    # Accepts the requests-style float or (connect, read) tuple
+    if isinstance(timeout, tuple):
+        return httpx.Timeout(timeout[1], connect=timeout[0])
+    return httpx.Timeout(timeout)
+
+
+def get_async_client():
+    """
+    Returns the pooled httpx.AsyncClient of the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        limits = httpx.Limits(
+            max_connections=POOL_CONNECTIONS * POOL_MAXSIZE,
+            max_keepalive_connections=POOL_MAXSIZE,
+        )
+        client = _CLIENTS[loop] = httpx.AsyncClient(
+            timeout=_timeout(DEFAULT_TIMEOUT),
+            limits=limits,
+            # Transport-level retries cover connection failures only
+            transport=httpx.AsyncHTTPTransport(retries=RETRY_TOTAL, limits=limits),
+        )
+    return client
+
+
+async def async_http_request(method, url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    Sends a request through the shared async client, retrying with backoff
+    on the same transient statuses as the blocking client.
+    """
+    client = get_async_client()
+    for attempt in range(RETRY_TOTAL + 1):
+        response = await client.request(method, url, timeout=_timeout(timeout), **kwargs)
+        if response.status_code not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+            return response
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+
+async def async_http_get(url, **kwargs):
+    return await async_http_request("GET", url, **kwargs)
+
+
+async def async_http_post(url, **kwargs):
+    return await async_http_request("POST", url, **kwargs)
+
+
+@asynccontextmanager
+async def async_http_stream(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    Streams a GET response; iterate it with response.aiter_bytes().
+    """
+    async with get_async_client().stream("GET", url, timeout=_timeout(timeout), **kwargs) as response:
+        yield response
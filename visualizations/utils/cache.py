@@ -0,0 +1,188 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Runs stale-while-revalidate refreshes off the caller's thread
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ggst-cache-refresh")
+# Strong references to background refresh tasks of coroutine loaders
+_REFRESH_TASKS = set()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live.
+
+    get_or_load() and get_or_load_async() are single-flight: while a key is
+    being loaded, other callers asking for the same key, from any thread or
+    coroutine, wait on the first caller's result instead of starting a second
+    upstream fetch.
+
+    With stale_ttl > 0, an entry that is past its ttl but still within
+    stale_ttl is returned as-is while get_or_load() refreshes it in the
+    background.
+    """
+
+    def __init__(self, maxsize=128, ttl=300, stale_ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._data = OrderedDict()  # key -> (fresh_until, value)
+        self._inflight = {}  # key -> Future
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """
+        Returns the fresh value for key, or default. Never triggers a load.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            now = time.monotonic()
+            if entry is None or entry[0] <= now:
+                if entry is not None and entry[0] + self.stale_ttl <= now:
+                    del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """
+        Drops every entry whose key satisfies predicate(key).
+        """
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+    def get_or_load(self, key, loader):
+        value, future, owner = self._claim(key, loader)
+        if future is None:
+            return value
+        if not owner:
+            return future.result()
+        return self._load(key, loader, future, True)
+
+    async def get_or_load_async(self, key, loader):
+        """
+        Coroutine version of get_or_load().
+
+        loader is either a coroutine function, awaited on the event loop, or a
+        blocking callable, run in the loop's default executor. Coroutines and
+        threads asking for the same key share one in-flight load.
+        """
+        value, future, owner = self._claim(key, loader)
+        if future is None:
+            return value
+        if not owner:
+            return await asyncio.wrap_future(future)
+        if inspect.iscoroutinefunction(loader):
+            return await self._load_async(key, loader, future, True)
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(None, self._load, key, loader, future, False)
+        return await asyncio.wrap_future(future)
+
+    def _claim(self, key, loader):
+        """
+        Returns (value, None, False) on a hit, otherwise (None, future, owner)
+        where owner tells the caller whether it must run the load itself.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            now = time.monotonic()
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return entry[1], None, False
+
+            future = self._inflight.get(key)
+            if entry is not None and entry[0] + self.stale_ttl > now:
+                self.stale_hits += 1
+                self._data.move_to_end(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    if inspect.iscoroutinefunction(loader):
+                        task = asyncio.get_running_loop().create_task(self._load_async(key, loader, future, False))
+                        _REFRESH_TASKS.add(task)
+                        task.add_done_callback(_REFRESH_TASKS.discard)
+                    else:
+                        _REFRESH_EXECUTOR.submit(self._load, key, loader, future, False)
+                return entry[1], None, False
+
+            self.misses += 1
+            if future is not None:
+                return None, future, False
+            future = self._inflight[key] = Future()
+            return None, future, True
+
+    def _load(self, key, loader, future, reraise):
+        try:
+            value = loader()
+        except BaseException as exc:
+            return self._fail(key, future, exc, reraise)
+        return self._complete(key, future, value)
+
+    async def _load_async(self, key, loader, future, reraise):
+        try:
+            value = await loader()
+        except BaseException as exc:
+            return self._fail(key, future, exc, reraise)
+        return self._complete(key, future, value)
+
+    def _complete(self, key, future, value):
+        with self._lock:
+            self._store(key, value)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def _fail(self, key, future, exc, reraise):
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_exception(exc)
+        if reraise:
+            raise exc
+        # Background and executor callers see the error through the future;
+        # a failed stale refresh keeps serving the old entry
+        return None
+
+    def _store(self, key, value):
+        # Caller must hold self._lock
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+_MISSING = object()
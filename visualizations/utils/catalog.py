@@ -0,0 +1,59 @@
+from .async_http import async_http_get
+from .disk_cache import shared_get_or_load, shared_get_or_load_async
+from .endpoints import api_url
+from .http import http_get
+
+LIST_REGIONS_ENDPOINT = 'listRegions'
+STORAGE_OPTIONS_ENDPOINT = 'getStorageOptions'
+
+CATALOG_TTL = 3600
+
+
+def _load_region_options():
+    response = http_get(api_url(LIST_REGIONS_ENDPOINT))
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def _load_storage_options():
+    response = http_get(api_url(STORAGE_OPTIONS_ENDPOINT))
+    if response.status_code != 200:
+        return None
+    return response.json().get("storage_options", [])
+
+
+def fetch_region_options():
+    """
+    Returns the [{"label", "value"}, ...] regions from ggst-api, or [] on error.
+    """
+    return shared_get_or_load("list_regions", [], _load_region_options, ttl=CATALOG_TTL) or []
+
+
+def fetch_storage_options():
+    """
+    Returns the [{"label", "value"}, ...] storage types from ggst-api, or [] on error.
+    """
+    return shared_get_or_load("storage_options", [], _load_storage_options, ttl=CATALOG_TTL) or []
+
+
+async def _load_region_options_async():
+    response = await async_http_get(api_url(LIST_REGIONS_ENDPOINT))
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+async def _load_storage_options_async():
+    response = await async_http_get(api_url(STORAGE_OPTIONS_ENDPOINT))
+    if response.status_code != 200:
+        return None
+    return response.json().get("storage_options", [])
+
+
+async def fetch_region_options_async():
+    return await shared_get_or_load_async("list_regions", [], _load_region_options_async, ttl=CATALOG_TTL) or []
+
+
+async def fetch_storage_options_async():
+    return await shared_get_or_load_async("storage_options", [], _load_storage_options_async, ttl=CATALOG_TTL) or []
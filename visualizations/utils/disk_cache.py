@@ -0,0 +1,178 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Directory holding the shared cache database. The disk cache is disabled
+# unless this environment variable is set, e.g. GGST_CACHE_DIR=/var/cache/ggst
+CACHE_DIR_ENV = "GGST_CACHE_DIR"
+CACHE_FILE = "ggst_cache.sqlite3"
+
+# How long a worker may hold the fetch lease for a key before others give up
+# waiting on it and fetch themselves.
+LEASE_TIMEOUT = 30
+POLL_INTERVAL = 0.05
+
+
+class DiskCache:
+    """
+    SQLite-backed JSON cache shared by every worker process on a node.
+
+    Each write is a single transaction, so readers never observe a partial
+    value. get_or_load() takes a short-lived lease on a cache miss so that
+    only one process fetches a given key while the others wait for it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, until REAL NOT NULL)")
+
+    def _connection(self):
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=LEASE_TIMEOUT, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl),
+            )
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidate(self, key):
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def invalidate_prefix(self, prefix):
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        self._connection().execute("DELETE FROM entries WHERE key LIKE ? ESCAPE '\\'", (escaped + "%",))
+
+    def _acquire_lease(self, key):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT until FROM leases WHERE key = ?", (key,)).fetchone()
+            acquired = row is None or row[0] <= now
+            if acquired:
+                conn.execute(
+                    "INSERT OR REPLACE INTO leases (key, until) VALUES (?, ?)", (key, now + LEASE_TIMEOUT)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return acquired
+
+    def _release_lease(self, key):
+        self._connection().execute("DELETE FROM leases WHERE key = ?", (key,))
+
+    def get_or_load(self, key, loader, ttl):
+        """
+        Returns the cached value for key, or runs loader() in exactly one
+        process and shares its result. None results are not stored.
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+            if self._acquire_lease(key):
+                break
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            # The previous lease holder may have stored the value between our
+            # miss and taking over its released lease
+            value = self.get(key)
+            if value is not None:
+                return value
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            self._release_lease(key)
+
+
+_DISK_CACHE = None
+_DISK_CACHE_LOCK = threading.Lock()
+
+
+def get_disk_cache():
+    """
+    Returns the node-wide DiskCache, or None when GGST_CACHE_DIR is unset.
+    """
+    global _DISK_CACHE
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+    if _DISK_CACHE is None:
+        with _DISK_CACHE_LOCK:
+            if _DISK_CACHE is None:
+                os.makedirs(cache_dir, exist_ok=True)
+                _DISK_CACHE = DiskCache(os.path.join(cache_dir, CACHE_FILE))
+    return _DISK_CACHE
+
+
+def shared_get_or_load(namespace, key, loader, ttl):
+    """
+    Runs loader() through the disk cache when it is enabled, otherwise calls
+    it directly. key must be JSON-serializable.
+    """
+    cache = get_disk_cache()
+    if cache is None:
+        return loader()
+    return cache.get_or_load(json.dumps([namespace, key]), loader, ttl)
+
+
+async def shared_get_or_load_async(namespace, key, loader, ttl):
+    """
+    Async counterpart of shared_get_or_load() for a coroutine function loader.
+
+    SQLite is accessed from a worker thread. Async callers do not wait on
+    another process's lease, since polling would hold up the event loop.
+    """
+    cache = get_disk_cache()
+    if cache is None:
+        return await loader()
+    disk_key = json.dumps([namespace, key])
+    value = await asyncio.to_thread(cache.get, disk_key)
+    if value is None:
+        value = await loader()
+        if value is not None:
+            await asyncio.to_thread(cache.set, disk_key, value, ttl)
+    return value
+
+
+def shared_invalidate(namespace, key_prefix):
+    """
+    Drops disk entries of namespace whose key list starts with key_prefix.
+    """
+    cache = get_disk_cache()
+    if cache is not None:
+        # Strip the closing brackets so ["a"] also matches ["a", "grace"]
+        cache.invalidate_prefix(json.dumps([namespace, key_prefix])[:-2])
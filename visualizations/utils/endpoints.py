@@ -0,0 +1,53 @@
+import os
+from functools import lru_cache
+
+# Base URLs of the upstream services. Each can be pointed at a nearby mirror
+# or caching proxy through the environment, or at runtime with configure().
+DEFAULT_THREDDS_WMS_URL = "http://13.201.155.87:4000/thredds/wms/regions/data"
+# The legend URL is handed to browsers, so it defaults to the public host
+DEFAULT_LEGEND_WMS_URL = "https://ggst-api.geoglows.org/thredds/wms/regions/data"
+DEFAULT_API_URL = "https://ggst-api.geoglows.org"
+
+_ENDPOINTS = {
+    "thredds_wms": os.environ.get("GGST_THREDDS_WMS_URL", DEFAULT_THREDDS_WMS_URL).rstrip("/"),
+    "legend_wms": os.environ.get("GGST_LEGEND_WMS_URL", DEFAULT_LEGEND_WMS_URL).rstrip("/"),
+    "api": os.environ.get("GGST_API_URL", DEFAULT_API_URL).rstrip("/"),
+}
+
+
+def configure(thredds_wms_url=None, legend_wms_url=None, api_url=None):
+    """
+    Overrides the base URLs used by every GGST driver in this process.
+    """
+    for name, url in (("thredds_wms", thredds_wms_url), ("legend_wms", legend_wms_url), ("api", api_url)):
+        if url:
+            _ENDPOINTS[name] = url.rstrip("/")
+    dataset_url.cache_clear()
+
+
+@lru_cache(maxsize=1024)
+def dataset_path(region_name, storage_type):
+    """
+    Returns the NetCDF file of a region/storage pair relative to the data root.
+    """
+    if region_name != "global":
+        return f"{region_name}/{region_name}_{storage_type}.nc"
+    return f"GRC_{storage_type}.nc"
+
+
+@lru_cache(maxsize=1024)
+def dataset_url(region_name, storage_type, service="thredds_wms"):
+    return f"{_ENDPOINTS[service]}/{dataset_path(region_name, storage_type)}"
+
+
+def legend_url(region_name, storage_type, styles, vmin, vmax, width=40, height=250):
+    return (
+        f"{dataset_url(region_name, storage_type, 'legend_wms')}"
+        "?SERVICE=WMS&VERSION=1.3.0&REQUEST=GetLegendGraphic&LAYER=lwe_thickness"
+        f"&colorscalerange={vmin},{vmax}&STYLES=raster/{styles}&transparent=FALSE"
+        f"&WIDTH={width}&HEIGHT={height}"
+    )
+
+
+def api_url(endpoint):
+    return f"{_ENDPOINTS['api']}/api/{endpoint}"
@@ -1,28 +1,129 @@
-import requests
+from .async_http import HTTP_ERRORS, async_http_get
+from .cache import TTLCache
+from .disk_cache import shared_get_or_load, shared_get_or_load_async, shared_invalidate
+from .endpoints import api_url, dataset_url
+from .http import http_get
+from .layer_details import fetch_layer_details, fetch_layer_details_async, layer_scale_range
+from .local_dataset import local_layer_range, local_layer_range_async
 
-_RANGE_CACHE = {}
+# Min/max per (region, storage type). Entries are fresh for an hour and are
+# then served for up to another day while being refreshed in the background.
+_RANGE_CACHE = TTLCache(maxsize=256, ttl=3600, stale_ttl=86400)
 
+# A failed request, or a response without numeric min/max
+RANGE_ERRORS = HTTP_ERRORS + (TypeError, ValueError)
 
-def fetch_range(region_name, storage_type=None):
-    key = (region_name, storage_type)
 
-    if key in _RANGE_CACHE:
-        return _RANGE_CACHE[key]
-
-    base_url = "http://ggst-api.geoglows.org"
-    url = f"{base_url}/api/fetch_range?storage_type={storage_type}"
+def _range_url(region_name, storage_type):
+    url = f"{api_url('fetch_range')}?storage_type={storage_type}"
 
     if region_name != "global":
         url = f"{url}&region_name={region_name}"
+    return url
 
-    r = requests.get(url)
-    r.raise_for_status()
-    data = r.json()
 
-    result = {
+def _parse_range(data):
+    return {
         "min": float(data.get("min")),
         "max": float(data.get("max")),
     }
 
-    _RANGE_CACHE[key] = result
-    return result
+
+def _load_range(region_name, storage_type):
+    r = http_get(_range_url(region_name, storage_type))
+    r.raise_for_status()
+    return _parse_range(r.json())
+
+
+async def _load_range_async(region_name, storage_type):
+    r = await async_http_get(_range_url(region_name, storage_type))
+    r.raise_for_status()
+    return _parse_range(r.json())
+
+
+def _shared_load_range(region_name, storage_type):
+    return shared_get_or_load(
+        "fetch_range", [region_name, storage_type], lambda: _load_range(region_name, storage_type), _RANGE_CACHE.ttl
+    )
+
+
+def fetch_range(region_name, storage_type=None):
+    """
+    Returns {"min", "max"} for a region. Concurrent calls for the same key,
+    e.g. the min and max widgets rendering together, share one request.
+    """
+    key = (region_name, storage_type)
+    return _RANGE_CACHE.get_or_load(key, lambda: _shared_load_range(region_name, storage_type))
+
+
+async def fetch_range_async(region_name, storage_type=None):
+    async def load():
+        return await shared_get_or_load_async(
+            "fetch_range",
+            [region_name, storage_type],
+            lambda: _load_range_async(region_name, storage_type),
+            _RANGE_CACHE.ttl,
+        )
+
+    return await _RANGE_CACHE.get_or_load_async((region_name, storage_type), load)
+
+
+def fetch_layer_range(region_name, storage_type=None):
+    """
+    Returns {"min", "max"} read from the dataset under GGST_DATA_DIR when
+    there is one, otherwise from ggst-api. Only when ggst-api cannot answer
+    does it fall back to the scaleRange of the dataset's cached layerDetails,
+    which is THREDDS's default colour scale and the same for every region.
+    """
+    if storage_type:
+        local_range = local_layer_range(region_name, storage_type)
+        if local_range is not None:
+            return local_range
+    try:
+        return fetch_range(region_name, storage_type)
+    except RANGE_ERRORS:
+        if not storage_type:
+            raise
+        try:
+            scale_range = layer_scale_range(fetch_layer_details(dataset_url(region_name, storage_type)))
+        except HTTP_ERRORS:
+            scale_range = None
+        if scale_range is None:
+            raise
+        return scale_range
+
+
+async def fetch_layer_range_async(region_name, storage_type=None):
+    if storage_type:
+        local_range = await local_layer_range_async(region_name, storage_type)
+        if local_range is not None:
+            return local_range
+    try:
+        return await fetch_range_async(region_name, storage_type)
+    except RANGE_ERRORS:
+        if not storage_type:
+            raise
+        try:
+            details = await fetch_layer_details_async(dataset_url(region_name, storage_type))
+            scale_range = layer_scale_range(details)
+        except HTTP_ERRORS:
+            scale_range = None
+        if scale_range is None:
+            raise
+        return scale_range
+
+
+def invalidate_range(region_name, storage_type=None):
+    """
+    Drops cached ranges for a region, for one storage type or all of them.
+    """
+    if storage_type is not None:
+        _RANGE_CACHE.invalidate((region_name, storage_type))
+        shared_invalidate("fetch_range", [region_name, storage_type])
+    else:
+        _RANGE_CACHE.invalidate_where(lambda key: key[0] == region_name)
+        shared_invalidate("fetch_range", [region_name])
+
+
+def range_cache_stats():
+    return _RANGE_CACHE.stats()
@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+
+def write_atomic(path, data):
+    """
+    Writes bytes to path through a temporary file in the same directory, so
+    readers see either the old file or the complete new one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
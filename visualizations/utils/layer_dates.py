@@ -0,0 +1,31 @@
+import asyncio
+
+from .endpoints import dataset_url
+from .local_dataset import local_layer_dates, local_layer_dates_async
+from .metadata_index import indexed_dates
+from .time_dimension import fetch_layer_dates, fetch_layer_dates_async
+
+
+def resolve_layer_dates(region_name, storage_type, layer_name="lwe_thickness"):
+    """
+    Returns the dates of a region/storage dataset from the metadata index,
+    the local dataset or THREDDS, whichever answers first. Raises
+    HTTP_ERRORS when it comes to THREDDS and THREDDS cannot be reached.
+    """
+    dates = indexed_dates(region_name, storage_type)
+    if dates is None:
+        dates = local_layer_dates(region_name, storage_type, layer_name)
+    if dates is None:
+        dates = fetch_layer_dates(dataset_url(region_name, storage_type), layer_name)
+    return dates
+
+
+async def resolve_layer_dates_async(region_name, storage_type, layer_name="lwe_thickness"):
+    # The index lookup may stat and reload the index file, so keep it off the
+    # event loop
+    dates = await asyncio.to_thread(indexed_dates, region_name, storage_type)
+    if dates is None:
+        dates = await local_layer_dates_async(region_name, storage_type, layer_name)
+    if dates is None:
+        dates = await fetch_layer_dates_async(dataset_url(region_name, storage_type), layer_name)
+    return dates
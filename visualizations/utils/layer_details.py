@@ -0,0 +1,72 @@
+from .async_http import async_http_get
+from .cache import TTLCache
+from .disk_cache import shared_get_or_load, shared_get_or_load_async
+from .http import http_get
+
+LAYER_DETAILS_QUERY = "?request=GetMetadata&item=layerDetails&layerName={layer_name}"
+
+# GetMetadata layerDetails JSON per (dataset URL, layer). One response carries
+# the palettes, the default scaleRange and the units, so the styles, min and
+# max widgets of a region/storage selection share a single request.
+_LAYER_DETAILS_CACHE = TTLCache(maxsize=64, ttl=3600)
+
+
+def _load_layer_details(dataset_url, layer_name):
+    response = http_get(dataset_url + LAYER_DETAILS_QUERY.format(layer_name=layer_name))
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_layer_details(dataset_url, layer_name="lwe_thickness"):
+    """
+    Returns the cached layerDetails dict for layer_name in the WMS dataset at
+    dataset_url. Raises requests.RequestException when it cannot be fetched.
+    """
+    key = (dataset_url, layer_name)
+    return _LAYER_DETAILS_CACHE.get_or_load(
+        key,
+        lambda: shared_get_or_load(
+            "layer_details",
+            [dataset_url, layer_name],
+            lambda: _load_layer_details(dataset_url, layer_name),
+            _LAYER_DETAILS_CACHE.ttl,
+        ),
+    )
+
+
+async def _load_layer_details_async(dataset_url, layer_name):
+    response = await async_http_get(dataset_url + LAYER_DETAILS_QUERY.format(layer_name=layer_name))
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_layer_details_async(dataset_url, layer_name="lwe_thickness"):
+    """
+    Coroutine version of fetch_layer_details(), sharing its cache.
+    """
+    async def load():
+        return await shared_get_or_load_async(
+            "layer_details",
+            [dataset_url, layer_name],
+            lambda: _load_layer_details_async(dataset_url, layer_name),
+            _LAYER_DETAILS_CACHE.ttl,
+        )
+
+    return await _LAYER_DETAILS_CACHE.get_or_load_async((dataset_url, layer_name), load)
+
+
+def layer_palettes(details):
+    return details.get("palettes", [])
+
+
+def layer_scale_range(details):
+    """
+    Returns {"min", "max"} from the layer's scaleRange, or None if missing.
+    """
+    scale_range = details.get("scaleRange")
+    if not scale_range or len(scale_range) != 2:
+        return None
+    try:
+        return {"min": float(scale_range[0]), "max": float(scale_range[1])}
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,68 @@
+import base64
+import hashlib
+import os
+import tempfile
+import time
+
+from .cache import TTLCache
+from .disk_cache import CACHE_DIR_ENV
+from .files import write_atomic
+from .http import http_get
+
+LEGEND_TTL = 86400
+# Most legend files kept on disk; the least recently written are removed first
+MAX_LEGEND_FILES = 512
+
+# Legend PNG bytes per GetLegendGraphic URL. The URL already encodes the
+# dataset, style, colour scale range and size.
+_LEGEND_CACHE = TTLCache(maxsize=128, ttl=LEGEND_TTL)
+
+
+def legend_dir():
+    base_dir = os.environ.get(CACHE_DIR_ENV) or tempfile.gettempdir()
+    return os.path.join(base_dir, "ggst_legends")
+
+
+def _legend_path(url):
+    return os.path.join(legend_dir(), hashlib.sha256(url.encode()).hexdigest() + ".png")
+
+
+def _prune(directory):
+    entries = [e for e in os.scandir(directory) if e.name.endswith(".png")]
+    if len(entries) <= MAX_LEGEND_FILES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[: len(entries) - MAX_LEGEND_FILES]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def _load_legend(url):
+    path = _legend_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) < LEGEND_TTL:
+            with open(path, "rb") as f:
+                return f.read()
+    except OSError:
+        pass
+
+    response = http_get(url)
+    response.raise_for_status()
+    write_atomic(path, response.content)
+    _prune(os.path.dirname(path))
+    return response.content
+
+
+def fetch_legend_png(url):
+    """
+    Returns the legend PNG for url from memory, then the on-disk legend
+    directory, fetching it from THREDDS only when neither has it.
+    """
+    return _LEGEND_CACHE.get_or_load(url, lambda: _load_legend(url))
+
+
+def legend_data_uri(url):
+    return "data:image/png;base64," + base64.b64encode(fetch_legend_png(url)).decode("ascii")
+
@@ -0,0 +1,136 @@
+import base64
+import struct
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+# ncWMS2 (THREDDS 5) palette definitions, low to high, for the names it
+# advertises in layerDetails["palettes"]. Its div-* and seq-* palettes are the
+# ColorBrewer 2.0 schemes (11 and 9 classes), interpolated evenly across the
+# bar. Palettes whose definitions are not reproduced here, e.g. default,
+# x-Rainbow or psu-viridis, are not rendered locally.
+_COLORBREWER = {
+    "div-BrBG": "543005 8c510a bf812d dfc27d f6e8c3 f5f5f5 c7eae5 80cdc1 35978f 01665e 003c30",
+    "div-PiYG": "8e0152 c51b7d de77ae f1b6da fde0ef f7f7f7 e6f5d0 b8e186 7fbc41 4d9221 276419",
+    "div-PRGn": "40004b 762a83 9970ab c2a5cf e7d4e8 f7f7f7 d9f0d3 a6dba0 5aae61 1b7837 00441b",
+    "div-PuOr": "7f3b08 b35806 e08214 fdb863 fee0b6 f7f7f7 d8daeb b2abd2 8073ac 542788 2d004b",
+    "div-RdBu": "67001f b2182b d6604d f4a582 fddbc7 f7f7f7 d1e5f0 92c5de 4393c3 2166ac 053061",
+    "div-RdGy": "67001f b2182b d6604d f4a582 fddbc7 ffffff e0e0e0 bababa 878787 4d4d4d 1a1a1a",
+    "div-RdYlBu": "a50026 d73027 f46d43 fdae61 fee090 ffffbf e0f3f8 abd9e9 74add1 4575b4 313695",
+    "div-RdYlGn": "a50026 d73027 f46d43 fdae61 fee08b ffffbf d9ef8b a6d96a 66bd63 1a9850 006837",
+    "div-Spectral": "9e0142 d53e4f f46d43 fdae61 fee08b ffffbf e6f598 abdda4 66c2a5 3288bd 5e4fa2",
+    "seq-Blues": "f7fbff deebf7 c6dbef 9ecae1 6baed6 4292c6 2171b5 08519c 08306b",
+    "seq-Greens": "f7fcf5 e5f5e0 c7e9c0 a1d99b 74c476 41ab5d 238b45 006d2c 00441b",
+    "seq-Greys": "ffffff f0f0f0 d9d9d9 bdbdbd 969696 737373 525252 252525 000000",
+    "seq-Oranges": "fff5eb fee6ce fdd0a2 fdae6b fd8d3c f16913 d94801 a63603 7f2704",
+    "seq-Purples": "fcfbfd efedf5 dadaeb bcbddc 9e9ac8 807dba 6a51a3 54278f 3f007d",
+    "seq-Reds": "fff5f0 fee0d2 fcbba1 fc9272 fb6a4a ef3b2c cb181d a50f15 67000d",
+    "seq-YlGnBu": "ffffd9 edf8b1 c7e9b4 7fcdbb 41b6c4 1d91c0 225ea8 253494 081d58",
+    "seq-YlOrBr": "ffffe5 fff7bc fee391 fec44f fe9929 ec7014 cc4c02 993404 662506",
+    "seq-YlOrRd": "ffffcc ffeda0 fed976 feb24c fd8d3c fc4e2a e31a1c bd0026 800026",
+}
+PALETTES = {
+    name: [tuple(int(colour[i:i + 2], 16) for i in (0, 2, 4)) for colour in colours.split()]
+    for name, colours in _COLORBREWER.items()
+}
+# ncWMS2 also offers every palette reversed under this suffix
+INVERSE_SUFFIX = "-inv"
+
+# Stops used for the SVG gradient; enough to be indistinguishable from a
+# per-pixel ramp at legend sizes.
+SVG_STOPS = 32
+LABEL_WIDTH = 60
+
+
+def palette_stops(palette):
+    """
+    Returns the colour stops of a palette name, low to high, or None.
+    """
+    if not isinstance(palette, str):
+        return None
+    if palette.endswith(INVERSE_SUFFIX):
+        stops = PALETTES.get(palette[:-len(INVERSE_SUFFIX)])
+        return stops[::-1] if stops else None
+    return PALETTES.get(palette)
+
+
+def has_palette(palette):
+    return palette_stops(palette) is not None
+
+
+@lru_cache(maxsize=64)
+def colour_ramp(palette, n):
+    """
+    Returns an (n, 3) uint8 array of the palette sampled low to high.
+    """
+    stops = np.asarray(palette_stops(palette), dtype=np.float64)
+    positions = np.linspace(0.0, 1.0, len(stops))
+    samples = np.linspace(0.0, 1.0, n)
+    ramp = np.column_stack([np.interp(samples, positions, stops[:, c]) for c in range(3)])
+    ramp = np.rint(ramp).astype(np.uint8)
+    ramp.flags.writeable = False
+    return ramp
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+@lru_cache(maxsize=64)
+def render_legend_png(palette, width=40, height=250):
+    """
+    Renders the colour bar as PNG bytes, high values at the top. The bar does
+    not depend on min/max, so one image serves every colour scale range.
+    """
+    rows = colour_ramp(palette, height)[::-1]
+    pixels = np.repeat(rows[:, np.newaxis, :], width, axis=1).reshape(height, width * 3)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), pixels]).tobytes()
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(raw))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+@lru_cache(maxsize=64)
+def _svg_gradient(palette):
+    ramp = colour_ramp(palette, SVG_STOPS)
+    offsets = np.linspace(0, 100, SVG_STOPS)
+    return "".join(
+        f'<stop offset="{offset:.2f}%" stop-color="#{r:02x}{g:02x}{b:02x}"/>'
+        # The gradient runs top to bottom, so start from the high end
+        for offset, (r, g, b) in zip(offsets, ramp[::-1].tolist())
+    )
+
+
+@lru_cache(maxsize=1024)
+def render_legend_svg(palette, vmin, vmax, width=40, height=250, n_labels=5):
+    """
+    Renders the colour bar with n_labels evenly spaced value labels as SVG.
+    """
+    labels = []
+    for fraction in np.linspace(0.0, 1.0, n_labels):
+        value = vmax - fraction * (vmax - vmin)
+        y = min(max(fraction * height, 10), height - 2)
+        labels.append(
+            f'<text x="{width + 4}" y="{y:.1f}" font-size="10" font-family="sans-serif">{value:.4g}</text>'
+        )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width + LABEL_WIDTH}" height="{height}">'
+        f'<defs><linearGradient id="ramp" x1="0" y1="0" x2="0" y2="1">{_svg_gradient(palette)}</linearGradient></defs>'
+        f'<rect x="0" y="0" width="{width}" height="{height}" fill="url(#ramp)"/>'
+        + "".join(labels)
+        + "</svg>"
+    )
+
+
+def legend_svg_data_uri(palette, vmin, vmax, width=40, height=250):
+    svg = render_legend_svg(palette, float(vmin), float(vmax), width, height)
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode()).decode("ascii")
+
+
+def legend_png_data_uri(palette, width=40, height=250):
+    return "data:image/png;base64," + base64.b64encode(render_legend_png(palette, width, height)).decode("ascii")
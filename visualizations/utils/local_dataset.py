@@ -0,0 +1,130 @@
+import asyncio
+import os
+import threading
+
+import numpy as np
+
+from .cache import TTLCache
+from .endpoints import dataset_path
+from .time_dimension import format_to_iso
+
+try:
+    # Optional: pip install tethysdash_plugin-ggst[local]
+    import xarray as xr
+except ImportError:
+    xr = None
+
+# Root holding the GGST NetCDF files in the THREDDS layout
+# ({region}/{region}_{storage}.nc and GRC_{storage}.nc). Either a local or
+# mounted directory, or an OPeNDAP base URL. Unset means HTTP only.
+#
+# The time axis and the min/max are read from the files. Palettes are WMS
+# server settings and keep coming from THREDDS.
+DATA_DIR_ENV = "GGST_DATA_DIR"
+
+# Dates and ranges per (dataset, modification time, layer). A rewritten file
+# gets a new mtime, so its stale entries simply age out.
+_LOCAL_CACHE = TTLCache(maxsize=256, ttl=3600)
+_OPEN_LOCK = threading.Lock()
+
+LOCAL_ERRORS = (OSError, KeyError, ValueError, RuntimeError)
+
+
+def _is_remote(root):
+    return root.startswith(("http://", "https://"))
+
+
+def local_dataset_path(region_name, storage_type):
+    """
+    Returns the local path or OPeNDAP URL of a region/storage dataset, or
+    None when GGST_DATA_DIR is unset, xarray is missing or the file is absent.
+    """
+    root = os.environ.get(DATA_DIR_ENV)
+    if not root or xr is None or not storage_type:
+        return None
+    relative = dataset_path(region_name, storage_type)
+    if _is_remote(root):
+        return f"{root.rstrip('/')}/{relative}"
+    path = os.path.join(root, *relative.split("/"))
+    return path if os.path.isfile(path) else None
+
+
+def _mtime(path):
+    return None if _is_remote(path) else os.stat(path).st_mtime_ns
+
+
+def _open(path):
+    # netCDF4/HDF5 is not thread-safe while opening; reads after this only
+    # touch the variables actually indexed.
+    with _OPEN_LOCK:
+        return xr.open_dataset(path, cache=False)
+
+
+def _time_dim(variable):
+    if "time" in variable.dims:
+        return "time"
+    for dim in variable.dims:
+        if dim in variable.coords and variable.coords[dim].attrs.get("standard_name") == "time":
+            return dim
+    return variable.dims[0]
+
+
+def _read_dates(path, layer_name):
+    with _open(path) as ds:
+        times = ds[_time_dim(ds[layer_name])].values
+    if np.issubdtype(times.dtype, np.datetime64):
+        return np.datetime_as_string(times.astype("datetime64[D]"), unit="D").tolist()
+    # Non-standard calendars decode to cftime objects
+    return [format_to_iso(t) for t in times]
+
+
+def _read_range(path, layer_name):
+    # One time step at a time, so memory stays at a single grid
+    vmin, vmax = np.inf, -np.inf
+    with _open(path) as ds:
+        variable = ds[layer_name]
+        time_dim = _time_dim(variable)
+        for i in range(variable.sizes[time_dim]):
+            values = variable.isel({time_dim: i}).values
+            if np.isnan(values).all():
+                continue
+            vmin = min(vmin, float(np.nanmin(values)))
+            vmax = max(vmax, float(np.nanmax(values)))
+    if not np.isfinite(vmin):
+        return None
+    return {"min": vmin, "max": vmax}
+
+
+def _cached(kind, reader, region_name, storage_type, layer_name):
+    path = local_dataset_path(region_name, storage_type)
+    if path is None:
+        return None
+    try:
+        key = (kind, path, _mtime(path), layer_name)
+        return _LOCAL_CACHE.get_or_load(key, lambda: reader(path, layer_name))
+    except LOCAL_ERRORS:
+        return None
+
+
+def local_layer_dates(region_name, storage_type, layer_name="lwe_thickness"):
+    """
+    Returns the YYYY-MM-DD time axis read straight from the dataset file, or
+    None when there is no usable local dataset.
+    """
+    return _cached("dates", _read_dates, region_name, storage_type, layer_name)
+
+
+def local_layer_range(region_name, storage_type, layer_name="lwe_thickness"):
+    """
+    Returns {"min", "max"} of the layer over all time steps, or None.
+    """
+    return _cached("range", _read_range, region_name, storage_type, layer_name)
+
+
+async def local_layer_dates_async(region_name, storage_type, layer_name="lwe_thickness"):
+    return await asyncio.to_thread(local_layer_dates, region_name, storage_type, layer_name)
+
+
+
+async def local_layer_range_async(region_name, storage_type, layer_name="lwe_thickness"):
+    return await asyncio.to_thread(local_layer_range, region_name, storage_type, layer_name)
@@ -0,0 +1,310 @@
+"""
+Offline index of per-region GGST metadata.
+
+    ggst-index /var/lib/ggst/index.jsonl [--max-age 86400] [--workers 8]
+
+crawls every region from listRegions for every storage type from
+getStorageOptions and writes one JSON line per record: the region list, the
+storage options, and the dates, min/max and palettes of each dataset. With
+GGST_INDEX_FILE pointing at that file, the GGST data sources answer from it
+and only fall back to upstream for datasets it does not cover.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from .async_http import HTTP_ERRORS
+from .catalog import fetch_region_options, fetch_storage_options
+from .endpoints import dataset_url
+from .fetchrange import fetch_layer_range
+from .files import write_atomic
+from .layer_details import fetch_layer_details, layer_palettes
+from .local_dataset import local_layer_dates
+from .time_dimension import fetch_layer_dates
+
+INDEX_FILE_ENV = "GGST_INDEX_FILE"
+# Records older than this many seconds are re-crawled in the background by a
+# serving process; 0 disables background refresh.
+INDEX_MAX_AGE_ENV = "GGST_INDEX_MAX_AGE"
+DEFAULT_MAX_AGE = 86400
+
+# How often a serving process checks the index file for a newer version
+INDEX_CHECK_INTERVAL = 30
+# Errors that make one dataset's crawl fail without aborting the others, e.g.
+# a THREDDS HTML error page served with status 200
+CRAWL_ERRORS = HTTP_ERRORS + (ET.ParseError, ValueError)
+
+# A refresh lock older than this is assumed to belong to a dead process
+REFRESH_LOCK_TIMEOUT = 3600
+# Least time between two background refresh attempts of one index, whether
+# or not the last one succeeded; capped at the max age
+REFRESH_RETRY_INTERVAL = 3600
+CRAWL_WORKERS = 8
+
+LAYER_NAME = "lwe_thickness"
+
+
+class MetadataIndex:
+    """
+    In-memory view of an index file, keyed by (region, storage type).
+    """
+
+    def __init__(self, regions=None, storage_options=None, datasets=None):
+        self.regions = regions or []
+        self.storage_options = storage_options or []
+        self.datasets = datasets or {}
+
+    @classmethod
+    def load(cls, path):
+        index = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                kind = record.get("type")
+                if kind == "regions":
+                    index.regions = record["options"]
+                elif kind == "storage_options":
+                    index.storage_options = record["options"]
+                elif kind == "dataset":
+                    index.datasets[(record["region"], record["storage"])] = record
+        return index
+
+    def dump(self, path):
+        lines = [
+            {"type": "regions", "options": self.regions},
+            {"type": "storage_options", "options": self.storage_options},
+            *self.datasets.values(),
+        ]
+        data = "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines)
+        write_atomic(path, data.encode("utf-8"))
+
+    def dataset(self, region_name, storage_type):
+        return self.datasets.get((region_name, storage_type))
+
+    def oldest(self):
+        """
+        Returns the update time of the oldest dataset record, or None.
+        """
+        return min((record["updated"] for record in self.datasets.values()), default=None)
+
+
+def _crawl_dataset(region_name, storage_type):
+    url = dataset_url(region_name, storage_type)
+    try:
+        dates = local_layer_dates(region_name, storage_type, LAYER_NAME)
+        if dates is None:
+            dates = fetch_layer_dates(url, LAYER_NAME)
+        palettes = layer_palettes(fetch_layer_details(url, LAYER_NAME))
+    except CRAWL_ERRORS:
+        return None
+
+    try:
+        value_range = fetch_layer_range(region_name, storage_type)
+    except (CRAWL_ERRORS + (TypeError,)):
+        value_range = None
+
+    return {
+        "type": "dataset",
+        "region": region_name,
+        "storage": storage_type,
+        "dates": dates,
+        "range": value_range,
+        "palettes": palettes,
+        "updated": time.time(),
+    }
+
+
+def refresh_index(path, max_age=0, workers=CRAWL_WORKERS):
+    """
+    Crawls every region/storage pair and rewrites the index at path.
+
+    Records younger than max_age seconds are kept as they are, so a periodic
+    refresh only re-crawls what has aged out. A dataset that cannot be
+    fetched keeps its previous record. Returns the number of datasets crawled.
+    """
+    index = MetadataIndex.load(path) if os.path.exists(path) else MetadataIndex()
+
+    regions = fetch_region_options()
+    storage_options = fetch_storage_options()
+    if not regions or not storage_options:
+        raise RuntimeError("ggst-api returned no regions or storage options")
+
+    keys = [(region["value"], storage["value"]) for region in regions for storage in storage_options]
+    now = time.time()
+    stale = [
+        key for key in keys
+        if key not in index.datasets or now - index.datasets[key]["updated"] >= max_age
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        crawled = dict(zip(stale, pool.map(lambda key: _crawl_dataset(*key), stale)))
+
+    datasets = {}
+    for key in keys:
+        record = crawled.get(key) or index.datasets.get(key)
+        if record is not None:
+            datasets[key] = record
+
+    MetadataIndex(regions, storage_options, datasets).dump(path)
+    return len(stale)
+
+
+_INDEX = None
+_INDEX_STATE = {"path": None, "mtime": None, "checked": 0.0}
+_INDEX_LOCK = threading.Lock()
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ggst-index-refresh")
+_REFRESHING = threading.Event()
+
+
+def _max_age():
+    try:
+        return float(os.environ.get(INDEX_MAX_AGE_ENV, DEFAULT_MAX_AGE))
+    except ValueError:
+        return DEFAULT_MAX_AGE
+
+
+def _acquire_refresh_lock(lock_path):
+    # O_EXCL creation is atomic, so one process per node refreshes the index
+    try:
+        if time.time() - os.stat(lock_path).st_mtime > REFRESH_LOCK_TIMEOUT:
+            os.unlink(lock_path)
+    except OSError:
+        pass
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except OSError:
+        return False
+    return True
+
+
+def _attempt_marker(path):
+    # Touched on every refresh attempt; its mtime is shared by all processes
+    return path + ".attempted"
+
+
+def _last_attempt(path):
+    try:
+        return os.stat(_attempt_marker(path)).st_mtime
+    except OSError:
+        return None
+
+
+def _background_refresh(path, max_age):
+    lock_path = path + ".lock"
+    try:
+        if not _acquire_refresh_lock(lock_path):
+            return
+        try:
+            with open(_attempt_marker(path), "a"):
+                pass
+            os.utime(_attempt_marker(path))
+            refresh_index(path, max_age)
+        except (HTTP_ERRORS + (OSError, RuntimeError)):
+            # Keep serving the current index; the next check retries
+            pass
+        finally:
+            os.unlink(lock_path)
+    finally:
+        _REFRESHING.clear()
+
+
+def _maybe_refresh(path, index):
+    max_age = _max_age()
+    oldest = index.oldest()
+    now = time.time()
+    if max_age <= 0 or oldest is None or now - oldest < max_age:
+        return
+    # Datasets that keep failing keep their old records, so also wait out the
+    # retry interval after any attempt instead of re-crawling on every check
+    last_attempt = _last_attempt(path)
+    if last_attempt is not None and now - last_attempt < min(max_age, REFRESH_RETRY_INTERVAL):
+        return
+    if not _REFRESHING.is_set():
+        _REFRESHING.set()
+        _REFRESH_EXECUTOR.submit(_background_refresh, path, max_age)
+
+
+def get_index():
+    """
+    Returns the MetadataIndex named by GGST_INDEX_FILE, reloading it when the
+    file changes, or None when no index is configured or readable.
+    """
+    global _INDEX
+    path = os.environ.get(INDEX_FILE_ENV)
+    if not path:
+        return None
+
+    now = time.monotonic()
+    with _INDEX_LOCK:
+        if _INDEX_STATE["path"] != path or now - _INDEX_STATE["checked"] >= INDEX_CHECK_INTERVAL:
+            _INDEX_STATE["checked"] = now
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if _INDEX_STATE["path"] != path or _INDEX_STATE["mtime"] != mtime:
+                    _INDEX = MetadataIndex.load(path)
+                    _INDEX_STATE.update(path=path, mtime=mtime)
+            except (OSError, ValueError, KeyError):
+                _INDEX = None
+                _INDEX_STATE.update(path=path, mtime=None)
+            if _INDEX is not None:
+                _maybe_refresh(path, _INDEX)
+        return _INDEX
+
+
+def _dataset_field(region_name, storage_type, field):
+    index = get_index()
+    record = index.dataset(region_name, storage_type) if index else None
+    return record.get(field) if record else None
+
+
+def indexed_region_options():
+    index = get_index()
+    return (index.regions or None) if index else None
+
+
+def indexed_storage_options():
+    index = get_index()
+    return (index.storage_options or None) if index else None
+
+
+def indexed_dates(region_name, storage_type):
+    return _dataset_field(region_name, storage_type, "dates")
+
+
+def indexed_range(region_name, storage_type):
+    return _dataset_field(region_name, storage_type, "range")
+
+
+def indexed_palettes(region_name, storage_type):
+    return _dataset_field(region_name, storage_type, "palettes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ggst-index", description="Build or refresh the offline GGST metadata index."
+    )
+    parser.add_argument(
+        "path", nargs="?", default=os.environ.get(INDEX_FILE_ENV),
+        help=f"index file to write (default: ${INDEX_FILE_ENV})",
+    )
+    parser.add_argument(
+        "--max-age", type=float, default=0,
+        help="only re-crawl datasets whose records are older than this many seconds (default: all)",
+    )
+    parser.add_argument("--workers", type=int, default=CRAWL_WORKERS, help="concurrent dataset crawls")
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error(f"no index path given and {INDEX_FILE_ENV} is not set")
+
+    crawled = refresh_index(args.path, args.max_age, args.workers)
+    index = MetadataIndex.load(args.path)
+    print(f"Indexed {len(index.datasets)} datasets ({crawled} crawled) into {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import asyncio
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from .async_http import HTTP_ERRORS, async_http_get
+from .cache import TTLCache
+from .endpoints import api_url
+from .http import http_get
+from .series import parse_series
+
+POINT_VALUES_ENDPOINT = "getPointValues"
+
+# The GRACE grid: its resolution in degrees and the (lat, lon) corner cells
+# are counted from, so cell centres lie at origin + (index + 0.5) * resolution.
+# Every click inside one cell has the same series, so the cache is keyed by
+# cell rather than raw coordinates. A dataset on another grid is configured
+# with e.g. GGST_GRID_RESOLUTION=0.5 and GGST_GRID_ORIGIN=-90.25,-180.25.
+GRID_RESOLUTION_ENV = "GGST_GRID_RESOLUTION"
+GRID_ORIGIN_ENV = "GGST_GRID_ORIGIN"
+DEFAULT_GRID_RESOLUTION = 0.25
+DEFAULT_GRID_ORIGIN = (-90.0, -180.0)
+
+# Upper bound on the number of series fetched for one selection
+MAX_POINTS = 25
+
+# Series per ((lat, lon) cell centre, storage_type)
+_POINT_SERIES_CACHE = TTLCache(maxsize=512, ttl=3600)
+
+# Bounds the number of concurrent getPointValues requests for multi-point charts
+_POINT_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ggst-point-series")
+
+
+@lru_cache(maxsize=16)
+def _parse_grid(resolution, origin):
+    try:
+        resolution = float(resolution)
+        if not 0 < resolution <= 90:
+            raise ValueError(resolution)
+    except (TypeError, ValueError):
+        resolution = DEFAULT_GRID_RESOLUTION
+    try:
+        latitude, longitude = (float(part) for part in origin.split(","))
+        origin = (latitude, longitude)
+    except (AttributeError, ValueError):
+        origin = DEFAULT_GRID_ORIGIN
+    return resolution, origin
+
+
+def grid():
+    """
+    Returns (resolution, (origin_lat, origin_lon)) of the grid clicks snap
+    to, from GGST_GRID_RESOLUTION and GGST_GRID_ORIGIN or the GRACE defaults.
+    """
+    return _parse_grid(os.environ.get(GRID_RESOLUTION_ENV), os.environ.get(GRID_ORIGIN_ENV))
+
+
+def _resolve(resolution, origin):
+    default_resolution, default_origin = grid()
+    return resolution or default_resolution, origin or default_origin
+
+
+def snap_to_grid(latitude, longitude, resolution=None, origin=None):
+    """
+    Returns the (row, col) index of the grid cell containing the point.
+    resolution and origin default to grid().
+    """
+    resolution, (lat0, lon0) = _resolve(resolution, origin)
+    # Rows whose centre lies within [-90, 90]
+    first_row = math.ceil((-90 - lat0) / resolution - 0.5)
+    last_row = math.floor((90 - lat0) / resolution - 0.5)
+    n_cols = round(360 / resolution)
+    row = min(max(math.floor((latitude - lat0) / resolution), first_row), last_row)
+    col = math.floor(((longitude - lon0) % 360) / resolution) % n_cols
+    return row, col
+
+
+def _wrap_longitude(longitude):
+    return (longitude + 180) % 360 - 180
+
+
+def cell_center(cell, resolution=None, origin=None):
+    resolution, (lat0, lon0) = _resolve(resolution, origin)
+    row, col = cell
+    return lat0 + (row + 0.5) * resolution, _wrap_longitude(lon0 + (col + 0.5) * resolution)
+
+
+def cells_in_polygon(longitudes, latitudes, resolution=None, origin=None):
+    """
+    Returns the (lat, lon) centres of the grid cells whose centre lies inside
+    the polygon ring, or the cell under the ring's centroid when the polygon
+    is smaller than a cell.
+    """
+    resolution, origin = _resolve(resolution, origin)
+    lat0, lon0 = origin
+    xs = np.asarray(longitudes, dtype=np.float64)
+    ys = np.asarray(latitudes, dtype=np.float64)
+    row0, col0 = snap_to_grid(ys.min(), xs.min(), resolution, origin)
+    row1, col1 = snap_to_grid(ys.max(), xs.max(), resolution, origin)
+    center_x, center_y = np.meshgrid(
+        _wrap_longitude(lon0 + (np.arange(col0, col1 + 1) + 0.5) * resolution),
+        lat0 + (np.arange(row0, row1 + 1) + 0.5) * resolution,
+    )
+    px = center_x.ravel()
+    py = center_y.ravel()
+
+    # Even-odd ray casting, one vectorized pass per polygon edge
+    inside = np.zeros(px.shape, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for xi, yi, xj, yj in zip(xs, ys, np.roll(xs, 1), np.roll(ys, 1)):
+            crosses = (yi > py) != (yj > py)
+            inside ^= crosses & (px < (xj - xi) * (py - yi) / (yj - yi) + xi)
+
+    if not inside.any():
+        cell = snap_to_grid(ys.mean(), xs.mean(), resolution, origin)
+        return [cell_center(cell, resolution, origin)]
+    return list(zip(py[inside].tolist(), px[inside].tolist()))
+
+
+def _point_url(center, storage_type):
+    latitude, longitude = center
+    return (
+        f'{api_url(POINT_VALUES_ENDPOINT)}'
+        f'?latitude={latitude}'
+        f'&longitude={longitude}'
+        f'&storage_type={storage_type}'
+    )
+
+
+def _load_point_series(center, storage_type):
+    url = _point_url(center, storage_type)
+    try:
+        response = http_get(url, timeout=30)
+    except HTTP_ERRORS as e:
+        raise Exception(f"GeoGloWS request failed: {e}") from e
+    return _parse_point_response(response, url)
+
+
+async def _load_point_series_async(center, storage_type):
+    url = _point_url(center, storage_type)
+    try:
+        response = await async_http_get(url, timeout=30)
+    except HTTP_ERRORS as e:
+        raise Exception(f"GeoGloWS request failed: {e}") from e
+    return _parse_point_response(response, url)
+
+
+def _parse_point_response(response, url):
+    # Works for both requests and httpx responses
+    if response.status_code != 200:
+        # Try to extract a user-friendly error message from the JSON response
+        error_message = f"GeoGloWS API error (status {response.status_code})"
+        try:
+            error_data = response.json()
+            if isinstance(error_data, dict):
+                # Extract common error fields
+                detail = error_data.get("detail") or error_data.get("error") or error_data.get("message")
+                if detail:
+                    print(f"GeoGloWS: {detail}")
+                    error_message = "GeoGloWS: Failed to Load the Data"
+        except (ValueError, KeyError):
+            # If JSON parsing fails, use a snippet of the raw text
+            body_snippet = (response.text or "")[:200]
+            if body_snippet:
+                error_message = f"GeoGloWS API error: {body_snippet}"
+
+        raise Exception(error_message)
+
+    data = response.json()
+    if "values" not in data:
+        raise Exception(
+            f"GeoGloWS response missing 'values' key. url={url}, keys={list(data.keys())}"
+        )
+
+    return parse_series(data["values"])
+
+
+def fetch_point_series(latitude, longitude, storage_type):
+    """
+    Returns the columnar series (see series.parse_series) for the grid cell
+    containing the point.
+
+    Repeat and nearby clicks that fall in the same cell are served from cache.
+    """
+    center = cell_center(snap_to_grid(latitude, longitude))
+    return _POINT_SERIES_CACHE.get_or_load(
+        (center, storage_type), lambda: _load_point_series(center, storage_type)
+    )
+
+
+async def fetch_point_series_async(latitude, longitude, storage_type):
+    center = cell_center(snap_to_grid(latitude, longitude))
+
+    async def load():
+        return await _load_point_series_async(center, storage_type)
+
+    return await _POINT_SERIES_CACHE.get_or_load_async((center, storage_type), load)
+
+
+def fetch_point_series_many(points, storage_type):
+    """
+    Fetches the series for many (lat, lon) points concurrently.
+
+    Returns one series per point, in order. Points sharing a grid cell share
+    one request through the cache.
+    """
+    futures = [
+        _POINT_EXECUTOR.submit(fetch_point_series, latitude, longitude, storage_type)
+        for latitude, longitude in points
+    ]
+    return [future.result() for future in futures]
+
+
+async def fetch_point_series_many_async(points, storage_type):
+    return await asyncio.gather(
+        *(fetch_point_series_async(latitude, longitude, storage_type) for latitude, longitude in points)
+    )
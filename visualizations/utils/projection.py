@@ -0,0 +1,34 @@
+import threading
+
+import numpy as np
+from pyproj import Transformer
+
+WEB_MERCATOR = "EPSG:3857"
+WGS84 = "EPSG:4326"
+
+# pyproj Transformers are not thread-safe, so each thread keeps its own
+# registry of (src, dst) -> Transformer and builds a pipeline only once.
+_LOCAL = threading.local()
+
+
+def get_transformer(src=WEB_MERCATOR, dst=WGS84):
+    transformers = getattr(_LOCAL, "transformers", None)
+    if transformers is None:
+        transformers = _LOCAL.transformers = {}
+    transformer = transformers.get((src, dst))
+    if transformer is None:
+        transformer = transformers[(src, dst)] = Transformer.from_crs(src, dst, always_xy=True)
+    return transformer
+
+
+def reproject_points(xs, ys, src=WEB_MERCATOR, dst=WGS84):
+    """
+    Reprojects many x/y coordinates in one transform call.
+
+    Returns two float64 NumPy arrays (x, y) in the dst CRS, which is
+    (lon, lat) for the default EPSG:3857 -> EPSG:4326.
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    return get_transformer(src, dst).transform(xs, ys)
+
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .async_http import async_http_post
+from .cache import TTLCache
+from .catalog import fetch_region_options
+from .endpoints import api_url
+from .http import http_post
+from .series import parse_series
+
+REGION_SUMMARY_ENDPOINT = 'getRegionSummary'
+
+# Columnar series per (region, storage_type)
+_REGION_SUMMARY_CACHE = TTLCache(maxsize=256, ttl=3600)
+
+# Bounds the concurrent summary requests of one multi-storage chart
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ggst-region-summary")
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ggst-region-prefetch")
+_PREFETCH_STARTED = set()
+_PREFETCH_LOCK = threading.Lock()
+
+
+def _request_kwargs(region, storage_type):
+    return {
+        'data': {
+            'region': region,
+            'storage_type': storage_type,
+        },
+        'headers': {
+            'accept': 'application/json',
+            'Content-Type': 'application/x-www-form-urlencoded',
+        },
+    }
+
+
+def _load_region_summary(region, storage_type):
+    response = http_post(api_url(REGION_SUMMARY_ENDPOINT), **_request_kwargs(region, storage_type))
+    response.raise_for_status()
+    return parse_series(response.json()['values'])
+
+
+async def _load_region_summary_async(region, storage_type):
+    response = await async_http_post(api_url(REGION_SUMMARY_ENDPOINT), **_request_kwargs(region, storage_type))
+    response.raise_for_status()
+    return parse_series(response.json()['values'])
+
+
+def fetch_region_summary(region, storage_type):
+    """
+    Returns the cached columnar region summary series for (region, storage_type).
+    """
+    return _REGION_SUMMARY_CACHE.get_or_load(
+        (region, storage_type), lambda: _load_region_summary(region, storage_type)
+    )
+
+
+def fetch_region_summaries(region, storage_types):
+    """
+    Fetches the summaries of several storage types for one region
+    concurrently. Returns one series per storage type, in order.
+    """
+    futures = [
+        _FETCH_EXECUTOR.submit(fetch_region_summary, region, storage_type)
+        for storage_type in storage_types
+    ]
+    return [future.result() for future in futures]
+
+
+async def fetch_region_summary_async(region, storage_type):
+    async def load():
+        return await _load_region_summary_async(region, storage_type)
+
+    return await _REGION_SUMMARY_CACHE.get_or_load_async((region, storage_type), load)
+
+
+async def fetch_region_summaries_async(region, storage_types):
+    return await asyncio.gather(
+        *(fetch_region_summary_async(region, storage_type) for storage_type in storage_types)
+    )
+
+
+def _prefetch(storage_type):
+    for option in fetch_region_options():
+        _PREFETCH_EXECUTOR.submit(_warm, option["value"], storage_type)
+
+
+def _warm(region, storage_type):
+    try:
+        fetch_region_summary(region, storage_type)
+    except Exception as e:
+        print(f"Region summary prefetch failed for {region}/{storage_type}: {e}")
+
+
+def prefetch_region_summaries(storage_type):
+    """
+    Warms the region summary cache for every region from listRegions in the
+    background. Only the first call per storage type in a process does work.
+    """
+    with _PREFETCH_LOCK:
+        if storage_type in _PREFETCH_STARTED:
+            return
+        _PREFETCH_STARTED.add(storage_type)
+    _PREFETCH_EXECUTOR.submit(_prefetch, storage_type)
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+# float32 carries about 7 significant digits; values are rounded to that
+# precision when serialized so the JSON does not carry float32 -> float64 noise.
+_SIGNIFICANT_DIGITS = 7
+
+
+def parse_series(values):
+    """
+    Converts ggst-api [[timestamp, value], ...] pairs into a columnar series.
+
+    Returns {"timestamp": datetime64[s] array, "value": float32 array}.
+    Missing or non-numeric values become NaN.
+    """
+    if not values:
+        return {
+            "timestamp": np.array([], dtype="datetime64[s]"),
+            "value": np.array([], dtype=np.float32),
+        }
+    pairs = np.array(values, dtype=object)
+    timestamps = pd.to_datetime(pairs[:, 0], format="ISO8601", utc=True).tz_convert(None)
+    return {
+        "timestamp": timestamps.values.astype("datetime64[s]"),
+        "value": pd.to_numeric(pairs[:, 1], errors="coerce").astype(np.float32),
+    }
+
+
+def _timestamps_to_json(timestamps):
+    # Daily and monthly series serialize as plain dates
+    midnight = (timestamps - timestamps.astype("datetime64[D]")) == np.timedelta64(0, "s")
+    unit = "D" if midnight.all() else "s"
+    return np.datetime_as_string(timestamps, unit=unit).tolist()
+
+
+def _values_to_json(values):
+    values = values.astype(np.float64)
+    finite = np.isfinite(values)
+    with np.errstate(divide="ignore"):
+        magnitude = np.floor(np.log10(np.abs(np.where(finite & (values != 0), values, 1.0))))
+    scale = 10.0 ** (_SIGNIFICANT_DIGITS - 1 - magnitude)
+    rounded = np.round(values * scale) / scale
+    if finite.all():
+        return rounded.tolist()
+    # NaN is not valid JSON; Plotly draws None as a gap
+    return np.where(finite, rounded, None).tolist()
+
+
+def series_to_xy(series):
+    """
+    Returns the (x, y) lists for a Plotly trace from a columnar series.
+    """
+    return _timestamps_to_json(series["timestamp"]), _values_to_json(series["value"])
+
+
+def _lttb_indices(x, y, n_out):
+    # Largest-triangle-three-buckets: keeps the first and last samples and, in
+    # each bucket between them, the sample forming the largest triangle with
+    # the previously kept sample and the mean of the next bucket.
+    n = len(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_y = y[next_start:next_end]
+        next_y = next_y[np.isfinite(next_y)]
+        avg_x = x[next_start:next_end].mean()
+        avg_y = next_y.mean() if next_y.size else y[a]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(np.where(np.isnan(area), -1.0, area)))
+        selected[i + 1] = a
+    return selected
+
+
+def _minmax_indices(y, n_out):
+    # Keeps the first and last samples plus the lowest and highest sample of
+    # each of (n_out - 2) // 2 equal buckets, so at most n_out samples
+    n = len(y)
+    n_buckets = (n_out - 2) // 2
+    if n_buckets < 1:
+        return np.array([0, n - 1])
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    lows = offsets + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    indices = np.unique(np.concatenate([lows, highs, [0, n - 1]]))
+    return indices[indices < n]
+
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def downsample_args(max_points, method):
+    """
+    Normalizes the max_points and method arguments of a chart source, which
+    the dashboard may pass as strings. A missing or invalid max_points
+    disables downsampling.
+    """
+    try:
+        max_points = int(max_points) if max_points not in (None, "") else None
+    except (TypeError, ValueError):
+        max_points = None
+    method = method or "lttb"
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return max_points, method
+
+
+def downsample_series(series, max_points, method="lttb"):
+    """
+    Reduces a columnar series to at most max_points samples.
+
+    method is "lttb" (largest-triangle-three-buckets, keeps the visual shape)
+    or "minmax" (keeps each bucket's extremes). Series already within
+    max_points, or a max_points below 3, are returned unchanged.
+    """
+    n = len(series["value"])
+    if not max_points or max_points < 3 or n <= max_points:
+        return series
+
+    y = series["value"].astype(np.float64)
+    if method == "lttb":
+        indices = _lttb_indices(series["timestamp"].astype(np.int64).astype(np.float64), y, max_points)
+    elif method == "minmax":
+        indices = _minmax_indices(y, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return {"timestamp": series["timestamp"][indices], "value": series["value"][indices]}
+
+
+def align_series(series_list):
+    """
+    Aligns several columnar series on the union of their timestamps.
+
+    Returns new series sharing one timestamp array; samples a series does not
+    have are NaN.
+    """
+    if not series_list:
+        return []
+    index = series_list[0]["timestamp"]
+    for series in series_list[1:]:
+        index = np.union1d(index, series["timestamp"])
+
+    aligned = []
+    for series in series_list:
+        values = np.full(index.shape, np.nan, dtype=np.float32)
+        values[np.searchsorted(index, series["timestamp"])] = series["value"]
+        aligned.append({"timestamp": index, "value": values})
+    return aligned
@@ -0,0 +1,385 @@
+import re
+import warnings
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Union
+
+import dateparser
+import numpy as np
+import pandas as pd
+
+from .async_http import async_http_stream
+from .cache import TTLCache
+from .disk_cache import shared_get_or_load, shared_get_or_load_async, shared_invalidate
+from .http import http_get
+
+GET_CAPABILITIES_QUERY = "?service=WMS&version=1.3.0&request=GetCapabilities"
+
+# Parsed time dimension per (dataset URL, layer), shared by every driver that
+# needs the date list so one capabilities fetch serves all of them.
+_LAYER_DATES_CACHE = TTLCache(maxsize=64, ttl=3600)
+
+# Date index per (dataset URL, layer): the dates together with the response
+# validators and the raw time values they came from. It outlives the entries
+# above so that an expired date list is revalidated with a conditional request
+# and, when new months were published, only the new tail is parsed.
+DATE_INDEX_TTL = 30 * 86400
+_DATE_INDEX = TTLCache(maxsize=64, ttl=DATE_INDEX_TTL)
+
+
+def format_to_iso(dt):
+    return dt.strftime("%Y-%m-%d")
+
+
+def parse_time(value: str) -> Optional[datetime]:
+    """
+    Parses a single WMS time value, trying strict ISO-8601 before dateparser.
+    """
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return dateparser.parse(value)
+
+
+def format_times(values: List[str]) -> List[str]:
+    """
+    Converts a batch of WMS time values to YYYY-MM-DD strings.
+
+    ISO-8601 values (the THREDDS norm) are parsed in one vectorized NumPy
+    call; anything NumPy rejects falls back to parse_time per value.
+    """
+    if not values:
+        return []
+    try:
+        with warnings.catch_warnings():
+            # NumPy only warns on explicit UTC offsets; treat them as non-ISO
+            warnings.simplefilter("error")
+            stamps = np.array([v[:-1] if v.endswith("Z") else v for v in values], dtype="datetime64[ms]")
+    except (ValueError, Warning):
+        out = []
+        for value in values:
+            parsed = parse_time(value)
+            if parsed:
+                out.append(format_to_iso(parsed))
+        return out
+    return np.datetime_as_string(stamps, unit="D").tolist()
+
+
+_FRACTION = r"\d+(?:[.,]\d+)?"
+_PERIOD_RE = re.compile(
+    rf"^P(?:(?P<years>\d+)Y)?(?:(?P<months>\d+)M)?(?:(?P<weeks>{_FRACTION})W)?(?:(?P<days>{_FRACTION})D)?"
+    rf"(?:T(?:(?P<hours>{_FRACTION})H)?(?:(?P<minutes>{_FRACTION})M)?(?:(?P<seconds>{_FRACTION})S)?)?$"
+)
+_SECONDS = {"weeks": 7 * 86400, "days": 86400, "hours": 3600, "minutes": 60, "seconds": 1}
+
+
+def parse_period(period: str) -> Dict[str, float]:
+    """
+    Splits an ISO-8601 duration such as P1M, PT6H or PT0.5H into its non-zero
+    parts. Years and months must be whole; the other parts may be fractional.
+    """
+    match = _PERIOD_RE.match(period.strip().upper())
+    parts = {k: float(v.replace(",", ".")) for k, v in match.groupdict().items() if v} if match else {}
+    parts = {k: int(v) if v.is_integer() else v for k, v in parts.items() if v}
+    if not parts:
+        raise ValueError(f"Invalid ISO-8601 period: {period}")
+    return parts
+
+
+def _month_range(start: np.datetime64, end: np.datetime64, step: int) -> np.ndarray:
+    # Steps whole months from start, keeping its day of month (clipped to the
+    # month length) and time of day.
+    first = start.astype("datetime64[M]")
+    months = np.arange(first, end.astype("datetime64[M]") + 1, step)
+    day = start.astype("datetime64[D]") - first.astype("datetime64[D]")
+    time_of_day = start - start.astype("datetime64[D]")
+    month_len = (months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")
+    day = np.minimum(day, month_len - np.timedelta64(1, "D"))
+    stamps = (months.astype("datetime64[D]") + day).astype("datetime64[s]") + time_of_day
+    return stamps[stamps <= end]
+
+
+def expand_interval(interval: str, compact: bool = False) -> List[str]:
+    """
+    Expands a WMS start/end/period interval into the times it describes.
+
+    The period defaults to P1D when omitted. With compact=True the interval
+    is returned as a single start/end/period string instead, which is also
+    what a period that cannot be expanded falls back to.
+    """
+    start, end, *rest = (part.strip() for part in interval.split("/"))
+    period = rest[0] if rest and rest[0] else "P1D"
+    compact_form = [f"{start}/{end}/{period}"]
+    if compact:
+        return compact_form
+
+    start_dt = parse_time(start)
+    end_dt = parse_time(end)
+    if start_dt is None or end_dt is None:
+        return []
+    start_dt = start_dt.replace(tzinfo=None)
+    end_dt = end_dt.replace(tzinfo=None)
+
+    try:
+        parts = parse_period(period)
+    except ValueError:
+        return compact_form
+    calendar_months = 12 * parts.get("years", 0) + parts.get("months", 0)
+    fixed_seconds = round(sum(parts.get(name, 0) * seconds for name, seconds in _SECONDS.items()))
+    if not calendar_months and not fixed_seconds:
+        # Sub-second steps
+        return compact_form
+    fixed = np.timedelta64(fixed_seconds, "s")
+    start64 = np.datetime64(start_dt, "s")
+    end64 = np.datetime64(end_dt, "s")
+
+    if calendar_months and fixed:
+        offset = pd.DateOffset(months=calendar_months, seconds=fixed_seconds)
+        stamps = pd.date_range(start_dt, end_dt, freq=offset).values
+    elif calendar_months:
+        stamps = _month_range(start64, end64, calendar_months)
+    else:
+        stamps = np.arange(start64, end64 + np.timedelta64(1, "s"), fixed)
+
+    unit = "D" if calendar_months or fixed >= np.timedelta64(1, "D") else "s"
+    return np.datetime_as_string(stamps, unit=unit).tolist()
+
+
+def _split_times(text: str) -> List[str]:
+    return [d for d in (item.strip() for item in text.split(",")) if d]
+
+
+def _extract_dates(text: str, compact_intervals: bool = False) -> List[str]:
+    return _extract_items(_split_times(text), compact_intervals)
+
+
+def _extract_items(items: List[str], compact_intervals: bool = False) -> List[str]:
+    out: List[str] = []
+    pending: List[str] = []
+    for item in items:
+        if "/" in item:
+            out.extend(format_times(pending))
+            pending = []
+            out.extend(expand_interval(item, compact=compact_intervals))
+        else:
+            pending.append(item)
+    out.extend(format_times(pending))
+    return out
+
+
+def _append_tail(items: List[str], known: Optional[Dict]) -> Optional[List[str]]:
+    """
+    Returns known["dates"] extended with the dates of the items past the
+    known ones, or None when items is not an append-only continuation of the
+    raw values the known dates were parsed from.
+    """
+    if not known:
+        return None
+    count = known["raw_count"]
+    # Only explicit lists map one raw value to one date
+    if not count or len(known["dates"]) != count or len(items) < count:
+        return None
+    if items[0] != known["raw_first"] or items[count - 1] != known["raw_last"]:
+        return None
+    tail = items[count:]
+    if any("/" in item for item in tail):
+        return None
+    return known["dates"] + format_times(tail)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class LayerTimeParser:
+    """
+    Incremental GetCapabilities parser for the time values of one layer.
+
+    Feed it chunks of the document; feed() returns True once the layer's
+    time Dimension (or Extent) has been read, after which dates holds the
+    result and the rest of the document can be skipped.
+    """
+
+    def __init__(self, layer_name: str, compact_intervals: bool = False, known: Optional[Dict] = None):
+        self.layer_name = layer_name
+        self.compact_intervals = compact_intervals
+        # A previous date_index(), whose dates are reused for an unchanged prefix
+        self.known = known
+        self.dates: List[str] = []
+        self.items: List[str] = []
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._path: List[str] = []
+        # One entry per open <Layer>: whether it is the target and its time texts
+        self._layers: List[Dict] = []
+
+    def feed(self, chunk: Union[str, bytes]) -> bool:
+        self._parser.feed(chunk)
+        for event, elem in self._parser.read_events():
+            tag = _local_name(elem.tag)
+            if event == "start":
+                self._path.append(tag)
+                if tag == "Layer":
+                    self._layers.append({"match": False, "Dimension": None, "Extent": None})
+                continue
+
+            self._path.pop()
+            layer = self._layers[-1] if self._layers else None
+            if layer is not None and self._path and self._path[-1] == "Layer":
+                if tag in ("Name", "Title") and elem.text == self.layer_name:
+                    # Like findall(".//Layer"), the outermost matching layer wins
+                    if not any(lyr["match"] for lyr in self._layers[:-1]):
+                        layer["match"] = True
+                elif tag in ("Dimension", "Extent") and elem.get("name", "").lower() == "time" and elem.text:
+                    if layer[tag] is None:
+                        layer[tag] = elem.text.strip()
+            elem.clear()
+
+            if tag == "Layer":
+                layer = self._layers.pop()
+                if layer["match"]:
+                    self._finish(layer["Dimension"] or layer["Extent"])
+                    return True
+            elif layer is not None and layer["match"] and layer["Dimension"]:
+                self._finish(layer["Dimension"])
+                return True
+        return False
+
+    def _finish(self, text: Optional[str]):
+        self.items = _split_times(text) if text else []
+        dates = None if self.compact_intervals else _append_tail(self.items, self.known)
+        self.dates = dates if dates is not None else _extract_items(self.items, self.compact_intervals)
+
+    def date_index(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Dict:
+        """
+        Returns the parsed dates with what is needed to revalidate them later.
+        """
+        return {
+            "dates": self.dates,
+            "raw_count": len(self.items),
+            "raw_first": self.items[0] if self.items else None,
+            "raw_last": self.items[-1] if self.items else None,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+
+def parse_dates_for_layer(
+    source: Union[str, bytes, Iterable[bytes]], layer_name: str, compact_intervals: bool = False
+) -> List[str]:
+    """
+    Returns the time values of layer_name from a WMS GetCapabilities document.
+
+    source is the XML text, or an iterable of byte chunks such as
+    Response.iter_content(). The document is parsed incrementally and parsing
+    stops as soon as the layer's time Dimension (or Extent) has been read, so
+    the rest of a large catalog is never downloaded or held in memory.
+    """
+    chunks = (source,) if isinstance(source, (str, bytes)) else source
+    parser = LayerTimeParser(layer_name, compact_intervals)
+    for chunk in chunks:
+        if parser.feed(chunk):
+            return parser.dates
+    return []
+
+
+async def parse_dates_for_layer_async(
+    chunks: AsyncIterable[bytes], layer_name: str, compact_intervals: bool = False
+) -> List[str]:
+    """
+    parse_dates_for_layer() for an async iterable of byte chunks.
+    """
+    parser = LayerTimeParser(layer_name, compact_intervals)
+    async for chunk in chunks:
+        if parser.feed(chunk):
+            return parser.dates
+    return []
+
+
+def _conditional_headers(known: Optional[Dict]) -> Dict[str, str]:
+    headers = {}
+    if known and known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known and known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+    return headers
+
+
+def _load_date_index(dataset_url: str, layer_name: str, known: Optional[Dict]) -> Dict:
+    url = dataset_url + GET_CAPABILITIES_QUERY
+    with http_get(url, timeout=10, stream=True, headers=_conditional_headers(known)) as resp:
+        if resp.status_code == 304 and known:
+            return known
+        resp.raise_for_status()
+        parser = LayerTimeParser(layer_name, known=known)
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            if parser.feed(chunk):
+                break
+        return parser.date_index(resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+
+
+async def _load_date_index_async(dataset_url: str, layer_name: str, known: Optional[Dict]) -> Dict:
+    url = dataset_url + GET_CAPABILITIES_QUERY
+    async with async_http_stream(url, timeout=10, headers=_conditional_headers(known)) as resp:
+        if resp.status_code == 304 and known:
+            return known
+        resp.raise_for_status()
+        parser = LayerTimeParser(layer_name, known=known)
+        async for chunk in resp.aiter_bytes(64 * 1024):
+            if parser.feed(chunk):
+                break
+        return parser.date_index(resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+
+
+def _shared_load_layer_dates(dataset_url: str, layer_name: str) -> List[str]:
+    key = (dataset_url, layer_name)
+    index = shared_get_or_load(
+        "layer_date_index",
+        [dataset_url, layer_name],
+        lambda: _load_date_index(dataset_url, layer_name, _DATE_INDEX.get(key)),
+        _LAYER_DATES_CACHE.ttl,
+    )
+    _DATE_INDEX.set(key, index)
+    return index["dates"]
+
+
+def fetch_layer_dates(dataset_url: str, layer_name: str = "lwe_thickness") -> List[str]:
+    """
+    Returns the dates of layer_name in the WMS dataset at dataset_url.
+
+    Results are memoized per (dataset_url, layer_name); concurrent callers for
+    the same dataset share a single GetCapabilities request. Once a result
+    expires it is revalidated with a conditional request, and a changed
+    document only has its newly appended time values parsed. Raises
+    requests.RequestException when the capabilities cannot be fetched.
+    """
+    key = (dataset_url, layer_name)
+    return _LAYER_DATES_CACHE.get_or_load(key, lambda: _shared_load_layer_dates(dataset_url, layer_name))
+
+
+async def fetch_layer_dates_async(dataset_url: str, layer_name: str = "lwe_thickness") -> List[str]:
+    """
+    Coroutine version of fetch_layer_dates(), sharing its cache. Raises one of
+    async_http.HTTP_ERRORS when the capabilities cannot be fetched.
+    """
+    key = (dataset_url, layer_name)
+
+    async def load():
+        index = await shared_get_or_load_async(
+            "layer_date_index",
+            [dataset_url, layer_name],
+            lambda: _load_date_index_async(dataset_url, layer_name, _DATE_INDEX.get(key)),
+            _LAYER_DATES_CACHE.ttl,
+        )
+        _DATE_INDEX.set(key, index)
+        return index["dates"]
+
+    return await _LAYER_DATES_CACHE.get_or_load_async(key, load)
+
+
+def invalidate_layer_dates(dataset_url: str, layer_name: str = "lwe_thickness"):
+    """
+    Drops the cached dates and their validators, forcing a full reload.
+    """
+    _LAYER_DATES_CACHE.invalidate((dataset_url, layer_name))
+    _DATE_INDEX.invalidate((dataset_url, layer_name))
+    shared_invalidate("layer_date_index", [dataset_url, layer_name])